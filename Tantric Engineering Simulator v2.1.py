@@ -10,6 +10,9 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from dataclasses import dataclass
+from types import SimpleNamespace
+
+from adaptive_integrator import GapChargeODE, solve_adaptive
 
 @dataclass
 class HVSParams:
@@ -78,6 +81,136 @@ def simulate_hvs(params: HVSParams, enable_sync: bool = True, T: float = 100.0,
         
     return pd.DataFrame(records)
 
+# --- バッチ実行 (Vectorized lanes) ---
+HVS_LANE_FIELDS = ("alpha", "beta", "gamma", "delta", "kappa", "R_int_base", "V_source", "pulse_width")
+SYNC_TIMES = (30, 60, 90)
+
+def stack_hvs_params(params_list, dtype=np.float64) -> dict:
+    """One array per HVSParams field used by the dynamics, one entry per lane."""
+    return {f: np.array([getattr(p, f) for p in params_list], dtype=dtype) for f in HVS_LANE_FIELDS}
+
+def hvs_init_state(lanes: dict, dtype=np.float64) -> dict:
+    n = len(lanes["alpha"])
+    return {"E": np.zeros(n, dtype=dtype), "V_gap": np.zeros(n, dtype=dtype),
+            "R_int_base": lanes["R_int_base"].astype(dtype, copy=True)}
+
+def hvs_stimulus(t: float) -> float:
+    return 1.0 if 10 <= t < 40 else 0.0
+
+def hvs_prediction_error(t: float) -> float:
+    return float(1.5 * np.exp(-0.5 * ((t - 50)/5)**2))
+
+def hvs_rebound(t: float) -> float:
+    """Transient R_int on top of the structural base."""
+    return float(0.2 * np.exp(-0.5 * ((t-70)/5)**2))
+
+def hvs_step(lanes: dict, t: float, dt: float, state: dict, sync_enabled, drive: dict = None) -> np.ndarray:
+    """
+    One step of `simulate_hvs` for every lane (state updated in place). Returns is_sync.
+    drive: optional {"S", "pe", "window"} per-lane arrays replacing the stimulus,
+           prediction error and pulse-window mask at time t (what-if branches).
+    """
+    E, V_gap, R_base = state["E"], state["V_gap"], state["R_int_base"]
+    if drive is None:
+        S = hvs_stimulus(t)
+        pe = hvs_prediction_error(t)
+        gap = min(abs(t - st) for st in SYNC_TIMES)
+        window = gap <= lanes["pulse_width"] / 2
+    else:
+        S, pe, window = drive["S"], drive["pe"], drive["window"]
+    is_sync = sync_enabled & window
+
+    upgrade = is_sync & (V_gap > 3.0)
+    R_base[upgrade] *= 0.85
+    R_int = R_base + hvs_rebound(t)
+
+    dVgap = 0.02 * (lanes["V_source"] - V_gap) - 0.8 * is_sync
+    np.maximum(0.0, V_gap + dVgap * dt, out=V_gap)
+
+    dE = (-lanes["alpha"] * E + lanes["beta"] * S + lanes["gamma"] * pe
+          - lanes["delta"] * R_int + np.where(is_sync, lanes["kappa"] * V_gap, 0.0))
+    E[...] = 10.0 * np.tanh((E + dE * dt) / 10.0)
+    return is_sync
+
+def simulate_hvs_batch(params_list, enable_sync=True, T: float = 100.0, dt: float = 0.1,
+                       dtype=np.float64, out: dict = None):
+    """
+    `simulate_hvs` for many HVSParams lanes at once (enable_sync: bool or per-lane bools).
+    Returns {"t": (steps,), "E"/"V_gap"/"R_int"/"Sync": (steps, n_lanes)};
+    `out` may supply preallocated (steps, n_lanes) arrays to fill in place.
+
+    dtype=np.float32 halves state and trajectory memory. The run is
+    deterministic, so the float64 batch is the reference: over all PRESETS
+    with and without sync (T=100, dt=0.1) max |dE| and |dV_gap| stay below
+    ~3e-6 and R_int differs only by float32 rounding (~1e-7), unless a lane's
+    V_gap sits within ~1e-6 of the 3.0 upgrade threshold during a sync window.
+    """
+    steps = int(T / dt) + 1
+    t_axis = np.linspace(0, T, steps)
+    lanes = stack_hvs_params(params_list, dtype)
+    n = len(params_list)
+    sync_enabled = np.broadcast_to(np.asarray(enable_sync, dtype=bool), (n,))
+    state = hvs_init_state(lanes, dtype)
+
+    out = dict(out) if out is not None else {}
+    for name in ("E", "V_gap", "R_int", "Sync"):
+        out.setdefault(name, np.empty((steps, n), dtype=dtype))
+    for i, t in enumerate(t_axis):
+        is_sync = hvs_step(lanes, t, dt, state, sync_enabled)
+        out["E"][i] = state["E"]
+        out["V_gap"][i] = state["V_gap"]
+        out["R_int"][i] = state["R_int_base"]
+        out["Sync"][i] = is_sync
+    out["t"] = t_axis
+    return out
+
+# --- 適応ステップ実行 (RK45 + events) ---
+def simulate_hvs_adaptive(params: HVSParams, enable_sync: bool = True, T: float = 100.0, dt: float = 0.1,
+                          rtol: float = 1e-6, atol: float = 1e-9, match_euler: bool = True):
+    """
+    Error-controlled counterpart of `simulate_hvs`, interpolated onto the same grid.
+    Pulse edges and the stimulus switch are breakpoints. Stats in df.attrs["solver"].
+
+    match_euler=True (default) keeps the loop's dt-dependent rules as rates (per-step
+    tanh shrink, one 0.85 decay per step while a pulse is open and V_gap > 3.0),
+    so results are comparable with `simulate_hvs` up to Euler truncation error
+    (max |dE| 0.04-0.15 across PRESETS, Kabbalist final R_int 0.00041 vs 0.00027).
+    match_euler=False uses the dt-independent model (one OS update per pulse,
+    smooth saturation; see adaptive_integrator.GapChargeODE). It differs from
+    `simulate_hvs` by design: e.g. Kabbalist final R_int 0.55 vs 0.00027,
+    max |dE| 0.3-1.0 across PRESETS.
+    """
+    steps = int(T / dt) + 1
+    t_axis = np.linspace(0, T, steps)
+    sync_times = SYNC_TIMES if enable_sync else ()
+
+    coef = SimpleNamespace(
+        alpha=params.alpha, beta=params.beta, gamma=params.gamma, delta=params.delta,
+        eta=0.0, kappa=params.kappa, E_max=10.0, V_source=params.V_source, rho=0.02, chi=0.8,
+        R_int_min=0.0, phase_transition_decay=0.85, sync_threshold=3.0,
+    )
+    model = GapChargeODE(
+        coef,
+        stimulus=hvs_stimulus,
+        pred_error=hvs_prediction_error,
+        sync=lambda t: float(any(abs(t - st) <= params.pulse_width/2 for st in sync_times)),
+        rebound=hvs_rebound,
+        euler_dt=dt if match_euler else None,
+    )
+    breakpoints = [10, 40] + [st + side * params.pulse_width/2 for st in sync_times for side in (-1, 1)]
+    # Euler records the state after the step taken at t_i
+    grid = np.append(t_axis, T + dt) if match_euler else t_axis
+    Y, stats = solve_adaptive(model, [0.0, 0.0, params.R_int_base], grid, breakpoints, rtol=rtol, atol=atol)
+    if match_euler:
+        Y = Y[1:]
+
+    is_sync = (np.abs(np.subtract.outer(t_axis, np.asarray(sync_times, dtype=float)))
+               <= params.pulse_width/2).any(axis=1)
+    df = pd.DataFrame({"t": t_axis, "E": Y[:, 0], "V_gap": Y[:, 1], "R_int": Y[:, 2],
+                       "Sync": is_sync.astype(float)})
+    df.attrs["solver"] = stats
+    return df
+
 # --- ABテストの実行と可視化 ---
 def run_ab_test(preset_name="Buddhist"):
     p = PRESETS[preset_name]
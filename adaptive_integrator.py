@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive Integrator (Dormand-Prince RK45 with event location)
+- Error-controlled steps (scipy RK45): steps grow in quiescent stretches.
+- Known discontinuities (sync-window edges, stimulus switches) are integration
+  breakpoints, so no step ever straddles them.
+- State events (V_gap hitting 0, V_gap crossing sync_threshold inside a sync
+  window, R hitting its floor) are located by root finding on the dense output.
+- Piecewise-constant per-step noise is not integrated by the solver (it would
+  force a breakpoint per step); `noise_response` adds it along the solution.
+- Results are interpolated onto the requested output grid.
+
+A model implements four hooks (see GapChargeODE):
+    rhs(t, y)                  -> dy/dt
+    events()                   -> list of event functions active right now
+    enter_segment(a, b, y)     -> y  (called at every breakpoint)
+    apply_event(t, y, index)   -> y  (called when events()[index] fires)
+
+Tested with: Python 3.10+, numpy, scipy
+"""
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+# Max accumulated |J h| per block of the noise_response scan (exp stays finite)
+SCAN_BLOCK_LOG = 300.0
+
+# ========== 1. Driver ==========
+
+def solve_adaptive(model, y0, t_eval, breakpoints=(), rtol=1e-6, atol=1e-9, max_step=np.inf):
+    """
+    Integrate `model` from t_eval[0] to t_eval[-1].
+    Returns (Y, stats): Y has shape (len(t_eval), len(y0)); stats counts
+    accepted steps, RHS evaluations, events and segments.
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    t_start, t_stop = t_eval[0], t_eval[-1]
+    inner = [b for b in breakpoints if t_start < b < t_stop]
+    edges = np.unique(np.concatenate([[t_start, t_stop], inner]))
+
+    Y = np.empty((len(t_eval), len(y0)))
+    y = np.array(y0, dtype=float)
+    stats = {"steps": 0, "rhs_evals": 0, "events": 0, "segments": 0}
+
+    for a, b in zip(edges[:-1], edges[1:]):
+        y = model.enter_segment(a, b, y)
+        t = a
+        while t < b:
+            events = model.events()
+            sol = solve_ivp(model.rhs, (t, b), y, method="RK45", dense_output=True,
+                            events=events or None, rtol=rtol, atol=atol, max_step=max_step)
+            stats["steps"] += len(sol.t) - 1
+            stats["rhs_evals"] += sol.nfev
+            stats["segments"] += 1
+
+            t_end = sol.t[-1]
+            mask = (t_eval >= t) & (t_eval <= t_end)
+            if mask.any():
+                Y[mask] = sol.sol(t_eval[mask]).T
+            y = sol.y[:, -1].copy()
+
+            if sol.status == 1:  # a terminal event fired
+                index = next(k for k, te in enumerate(sol.t_events) if len(te))
+                y = model.apply_event(t_end, y, index)
+                stats["events"] += 1
+                # Grid points exactly at the event take the post-event state
+                Y[t_eval == t_end] = y
+            t = t_end if sol.status == 1 else b
+    return Y, stats
+
+def make_event(fn, direction=0.0):
+    """Terminal event function for solve_ivp."""
+    def event(t, y):
+        return fn(t, y)
+    event.terminal = True
+    event.direction = direction
+    return event
+
+# ========== 2. Gap-Charging Model (tantric_sim / HVS) ==========
+
+class GapChargeODE:
+    """
+    Continuous form of the E / V_gap / R_int dynamics shared by
+    `tantric_sim.simulate` and `simulate_hvs`. State y = [E, V_gap, R_int_base].
+    The model is deterministic; noise is added afterwards by `noise_response`.
+
+    The Euler loops are dt-dependent by construction (tanh applied to the state
+    every step, OS update repeated every step of an open sync window), so the
+    model has two modes:
+
+    euler_dt = dt (match the loop run at step dt; steps still grow freely):
+    - Saturation: dE/dt = (E_max*tanh((E + f*dt)/E_max) - E) / dt, the loop's
+      per-step increment as a rate (its fixed points and shrink are kept).
+    - OS update: dR/dt = ln(decay)/dt * R while the window is open and
+      V_gap > sync_threshold (above R_int_min), i.e. one decay factor per dt.
+    euler_dt = None (dt-independent physics, not comparable with the loops):
+    - Saturation: E = E_max*tanh(u) with du/dt = f, i.e. dE/dt = f*(1 - (E/E_max)^2).
+    - OS update: R_int_base *= decay once per sync window, at window entry (or
+      when V_gap crosses the threshold upward inside the window).
+    In both modes V_gap is clamped at 0 via an event while the net charge flow
+    is negative, and threshold crossings are located as events.
+    """
+    def __init__(self, coef, stimulus, pred_error, sync, rebound, euler_dt=None):
+        self.c = coef                # TantricParams fields: alpha ... chi, R_int_min,
+                                     # phase_transition_decay, sync_threshold
+        self.stimulus = stimulus     # S(t)
+        self.pred_error = pred_error # pe(t)
+        self.sync_fn = sync          # 1.0 inside a sync window
+        self.rebound = rebound       # transient R_int(t) - R_int_base
+        self.euler_dt = euler_dt
+        self.os_rate = np.log(coef.phase_transition_decay) / euler_dt if euler_dt else 0.0
+        self.sync = 0.0
+        self.clamped = False
+        self.updated = False         # window mode: OS update already fired in this window
+        self.decaying = False        # euler mode: R_int_base currently decaying
+        self._kinds = []
+
+    def _dV(self, t, V):
+        c = self.c
+        return c.rho * (c.V_source - V) - c.chi * self.sync
+
+    def forcing(self, E, V, R_int, S, pe, sync):
+        """Noise-free E forcing from state and schedule values (scalars or arrays)."""
+        c = self.c
+        return -c.alpha * E + c.beta * S + c.gamma * pe - c.delta * R_int + c.kappa * V * sync
+
+    def drive(self, t, y, sync):
+        """Noise-free E forcing f(t, y) for a given sync level."""
+        E, V, R_base = y
+        return self.forcing(E, V, R_base + self.rebound(t), self.stimulus(t), self.pred_error(t), sync)
+
+    def rhs(self, t, y):
+        c = self.c
+        E = y[0]
+        dV = 0.0 if self.clamped else self._dV(t, y[1])
+        f = self.drive(t, y, self.sync)
+        if self.euler_dt:
+            dE = (c.E_max * np.tanh((E + f * self.euler_dt) / c.E_max) - E) / self.euler_dt
+        else:
+            dE = f * (1.0 - (E / c.E_max) ** 2)
+        dR = self.os_rate * y[2] if self.decaying else 0.0
+        return np.array([dE, dV, dR])
+
+    def _os_update(self, y):
+        y = y.copy()
+        y[2] = max(self.c.R_int_min, y[2] * self.c.phase_transition_decay)
+        self.updated = True
+        return y
+
+    def _start_decay(self, y):
+        c = self.c
+        return self.sync > 0.5 and y[1] > c.sync_threshold and y[2] > c.R_int_min
+
+    def enter_segment(self, a, b, y):
+        mid = 0.5 * (a + b)
+        was_sync = self.sync
+        self.sync = float(self.sync_fn(mid))
+        if self.sync > 0.5 and was_sync <= 0.5:
+            self.updated = False
+        y = y.copy()
+        if y[1] <= 0.0:
+            y[1] = 0.0
+        self.clamped = y[1] <= 0.0 and self._dV(mid, 0.0) <= 0.0
+        if self.euler_dt:
+            self.decaying = self._start_decay(y)
+        elif self.sync > 0.5 and not self.updated and y[1] > self.c.sync_threshold:
+            y = self._os_update(y)
+        return y
+
+    def events(self):
+        c = self.c
+        ev, self._kinds = [], []
+        if not self.clamped:
+            ev.append(make_event(lambda t, y: y[1], direction=-1.0))
+            self._kinds.append("floor")
+        if self.euler_dt:
+            if self.decaying:
+                ev.append(make_event(lambda t, y: y[1] - c.sync_threshold, direction=-1.0))
+                self._kinds.append("decay_off")
+                if c.R_int_min > 0:
+                    ev.append(make_event(lambda t, y: y[2] - c.R_int_min, direction=-1.0))
+                    self._kinds.append("decay_off")
+            elif self.sync > 0.5:
+                ev.append(make_event(lambda t, y: y[1] - c.sync_threshold, direction=1.0))
+                self._kinds.append("decay_on")
+        elif self.sync > 0.5 and not self.updated:
+            ev.append(make_event(lambda t, y: y[1] - c.sync_threshold, direction=1.0))
+            self._kinds.append("threshold")
+        return ev
+
+    def apply_event(self, t, y, index):
+        kind = self._kinds[index]
+        y = y.copy()
+        if kind == "floor":
+            y[1] = 0.0
+            self.clamped = self._dV(t, 0.0) <= 0.0
+        elif kind == "decay_off":
+            y[2] = max(y[2], self.c.R_int_min)
+            self.decaying = False
+        elif kind == "decay_on":
+            self.decaying = y[2] > self.c.R_int_min
+        else:
+            y = self._os_update(y)
+        return y
+
+def noise_response(model: GapChargeODE, t_axis, Y, noise, eta, schedule: dict):
+    """
+    E deviation driven by eta * noise[i] (held constant on [t_i, t_(i+1)), as
+    in the Euler loops) along the deterministic solution Y on t_axis.
+    The noise only enters E and E feeds nothing back, so this is the linear
+    response of the E equation, propagated exactly per step with the local
+    Jacobian (exponential Euler). Error is second order in the deviation.
+    schedule: the model's inputs on the grid as arrays, "S", "pe", "rebound" at
+    t_axis[:-1] and "sync" per step (the level inside [t_i, t_(i+1))).
+    The recurrence N[i+1] = exp(J_i h_i) N[i] + g_i is evaluated as a scan in
+    blocks whose accumulated |J h| stays below SCAN_BLOCK_LOG (no over/underflow).
+    """
+    c = model.c
+    h = np.diff(t_axis)
+    E, V, R_base = Y[:-1, 0], Y[:-1, 1], Y[:-1, 2]
+    f = model.forcing(E, V, R_base + schedule["rebound"], schedule["S"], schedule["pe"], schedule["sync"])
+    if model.euler_dt:
+        k = model.euler_dt
+        sech2 = 1.0 - np.tanh((E + f * k) / c.E_max) ** 2
+        J, b = (sech2 * (1.0 - c.alpha * k) - 1.0) / k, eta * sech2
+    else:
+        s = 1.0 - (E / c.E_max) ** 2
+        J, b = -c.alpha * s - 2.0 * f * E / c.E_max**2, eta * s
+    Jh = J * h
+    small = np.abs(Jh) <= 1e-12
+    gain = np.where(small, h, np.expm1(Jh) / np.where(small, 1.0, J))
+    g = b * noise[:len(h)] * gain
+
+    N = np.zeros(len(t_axis))
+    block = np.floor(np.cumsum(np.abs(Jh)) / SCAN_BLOCK_LOG)
+    cuts = np.concatenate([[0], np.flatnonzero(np.diff(block)) + 1, [len(h)]])
+    for a, e in zip(cuts[:-1], cuts[1:]):
+        L = np.cumsum(Jh[a:e])  # log of the propagator from t_a to t_(i+1)
+        N[a + 1:e + 1] = np.exp(L) * (N[a] + np.cumsum(g[a:e] * np.exp(-L)))
+    return N
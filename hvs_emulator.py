@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+HVS Outcome Emulator (Gaussian-process surrogate for simulate_hvs)
+- Trains on sweeps over chosen HVSParams axes (e.g. alpha, kappa, V_source),
+  simulated in one vectorized simulate_hvs_batch call per design.
+- Answers "what final R_int does this HVSParams give?" with a mean and an
+  error estimate (GP std including the fitted nugget, calibrated on
+  leave-one-out residuals); ~40 us per query at ~100 training runs.
+- Falls back to a real simulate_hvs run when the error estimate exceeds the
+  tolerance (or the query leaves the trained box). Fallback answers are memoised
+  per HVSParams, and new in-box points are folded into the GP in batches of
+  `refit_every` (or on `flush()` / `refine()`), not refit one by one.
+- `refine()` adds training runs where the estimated error is highest.
+
+Usage:
+    emu = HVSEmulator({"alpha": (0.2, 1.0), "kappa": (0.2, 0.8)}, output="R_int_final")
+    emu.fit(n_init=40).refine(rounds=4)
+    value, err, source = emu.query(HVSParams(alpha=0.5, kappa=0.45), tol=0.01)
+
+Tested with: Python 3.10+, numpy
+"""
+
+from dataclasses import astuple, replace
+
+import numpy as np
+
+from hvs_engine import HVSParams, simulate_hvs, simulate_hvs_batch
+
+# Scalar outcome per lane, from (steps, n) batch columns
+OUTPUTS = {
+    "R_int_final": lambda res: res["R_int"][-1],
+    "E_final":     lambda res: res["E"][-1],
+    "E_peak":      lambda res: res["E"].max(axis=0),
+    "V_gap_final": lambda res: res["V_gap"][-1],
+}
+
+# Nugget (relative noise variance) candidates for the GP fit
+NUGGETS = (1e-8, 1e-6, 1e-4, 1e-3, 1e-2, 1e-1)
+
+# ========== 1. Design ==========
+
+def _latin_hypercube(n, d, rng):
+    cut = (np.arange(n)[:, None] + rng.uniform(size=(n, d))) / n
+    for j in range(d):
+        cut[:, j] = rng.permutation(cut[:, j])
+    return cut
+
+# ========== 2. Emulator ==========
+
+class HVSEmulator:
+    def __init__(self, axes: dict, base: HVSParams = None, enable_sync: bool = True,
+                 output: str = "R_int_final", T: float = 100.0, dt: float = 0.1, seed: int = 0,
+                 refit_every: int = 16):
+        self.names = list(axes)
+        self.lo = np.array([axes[k][0] for k in self.names], dtype=float)
+        self.hi = np.array([axes[k][1] for k in self.names], dtype=float)
+        self.base = base or HVSParams()
+        self.enable_sync = enable_sync
+        self.output = output
+        self.T, self.dt = T, dt
+        self.rng = np.random.default_rng(seed)
+        self.X = np.empty((0, len(self.names)))  # unit-cube coordinates
+        self.y = np.empty(0)
+        self.n_simulated = 0
+        self.refit_every = refit_every
+        self._memo = {}     # astuple(HVSParams) -> simulated value
+        self._pending = []  # (u, value) from fallbacks, not yet in the fit
+
+    # --- simulation ---
+    def _to_params(self, u):
+        vals = self.lo + u * (self.hi - self.lo)
+        return replace(self.base, **{k: float(v) for k, v in zip(self.names, vals)})
+
+    def simulate(self, U) -> np.ndarray:
+        """Run the real model at unit-cube points U (one batch)."""
+        res = simulate_hvs_batch([self._to_params(u) for u in U], self.enable_sync, self.T, self.dt)
+        self.n_simulated += len(U)
+        return np.asarray(OUTPUTS[self.output](res), dtype=float)
+
+    # --- GP fit ---
+    def _kernel(self, A, B, ell):
+        d2 = np.square((A[:, None, :] - B[None, :, :]) / ell).sum(-1)
+        return np.exp(-0.5 * d2)
+
+    def _nll(self, ell, g):
+        """Negative log marginal likelihood (signal variance profiled out) and its factors."""
+        m = len(self.y)
+        K = self._kernel(self.X, self.X, ell) + g * np.eye(m)
+        try:
+            Lc = np.linalg.cholesky(K)
+        except np.linalg.LinAlgError:
+            return np.inf, None
+        r = self.y - self.mu
+        a = np.linalg.solve(Lc.T, np.linalg.solve(Lc, r))
+        s2 = max(r @ a / m, 1e-300)
+        return 0.5 * m * np.log(s2) + np.log(np.diag(Lc)).sum(), (Lc, a, s2)
+
+    def _fit(self):
+        """
+        Constant-mean GP with an anisotropic squared-exponential kernel.
+        Length scales (per axis) and the nugget g are picked on a grid by marginal
+        likelihood; the nugget absorbs what the kernel cannot resolve (e.g. the
+        jumps of R_int at OS updates) and is counted in the error estimate.
+        """
+        d = len(self.names)
+        self.mu = self.y.mean()
+        grid = np.geomspace(0.03, 3.0, 15)
+        best = (np.inf, None, None)
+        for g in NUGGETS:
+            for ell in grid:
+                nll, _ = self._nll(np.full(d, ell), g)
+                if nll < best[0]:
+                    best = (nll, np.full(d, ell), g)
+        _, ell, g = best
+        for _ in range(2):  # coordinate sweeps over the per-axis scales
+            for j in range(d):
+                for v in grid:
+                    trial = ell.copy()
+                    trial[j] = v
+                    nll, _ = self._nll(trial, g)
+                    if nll < best[0]:
+                        best = (nll, trial, g)
+                ell = best[1]
+        self.ell, self.g = best[1], best[2]
+        _, (Lc, a, s2) = self._nll(self.ell, self.g)
+        Linv = np.linalg.solve(Lc, np.eye(len(self.y)))
+        self.Kinv = Linv.T @ Linv
+        self.alpha, self.s2 = a, s2
+        # Leave-one-out residuals calibrate the GP std into an error estimate
+        diag = np.diag(self.Kinv)
+        loo_res = a / diag
+        loo_var = s2 / diag
+        self.calib = max(1.0, float(np.sqrt(np.mean(loo_res**2 / loo_var))))
+        self.loo_rmse = float(np.sqrt(np.mean(loo_res**2)))
+
+    def add(self, U, y):
+        self.X = np.vstack([self.X, U])
+        self.y = np.concatenate([self.y, y])
+        self._fit()
+
+    def flush(self):
+        """Fold pending fallback runs into the training set and refit."""
+        if self._pending:
+            U = np.array([u for u, _ in self._pending])
+            y = np.array([v for _, v in self._pending])
+            self._pending = []
+            self.add(U, y)
+        return self
+
+    def fit(self, n_init: int = 32):
+        U = _latin_hypercube(n_init, len(self.names), self.rng)
+        self.add(U, self.simulate(U))
+        return self
+
+    def refine(self, rounds: int = 1, n_new: int = 16, n_candidates: int = 2048):
+        """Add n_new runs per round at the candidates with the largest error estimate."""
+        self.flush()
+        for _ in range(rounds):
+            C = self.rng.uniform(size=(n_candidates, len(self.names)))
+            _, err = self.predict_unit(C)
+            pick = C[np.argsort(err)[-n_new:]]
+            self.add(pick, self.simulate(pick))
+        return self
+
+    # --- queries ---
+    def predict_unit(self, U):
+        """Mean and error estimate at unit-cube points U of shape (n, d)."""
+        k = self._kernel(np.atleast_2d(U), self.X, self.ell)
+        mean = self.mu + k @ self.alpha
+        var = self.s2 * np.maximum(1.0 + self.g - np.einsum("ij,jk,ik->i", k, self.Kinv, k), 0.0)
+        return mean, self.calib * np.sqrt(var)
+
+    def _unit(self, point):
+        if isinstance(point, HVSParams):
+            vals = np.array([getattr(point, k) for k in self.names], dtype=float)
+        elif isinstance(point, dict):
+            vals = np.array([point[k] for k in self.names], dtype=float)
+        else:
+            vals = np.asarray(point, dtype=float)
+        return (vals - self.lo) / (self.hi - self.lo)
+
+    def _off_axis(self, params: HVSParams) -> bool:
+        """True if params differ from `base` in a field the emulator does not model."""
+        return replace(params, **{k: getattr(self.base, k) for k in self.names}) != self.base
+
+    def predict(self, point):
+        """(mean, error estimate) for an HVSParams, {axis: value} dict or axis-ordered array."""
+        u = self._unit(point)
+        d = (u[None, :] - self.X) / self.ell
+        k = np.exp(-0.5 * np.einsum("ij,ij->i", d, d))
+        mean = self.mu + k @ self.alpha
+        var = self.s2 * max(1.0 + self.g - k @ self.Kinv @ k, 0.0)
+        return float(mean), float(self.calib * np.sqrt(var))
+
+    def query(self, point, tol: float = 1e-2, learn: bool = True):
+        """
+        Emulated value when the error estimate is within `tol`, otherwise a real
+        simulate_hvs run (memoised, so repeating a point does not re-simulate).
+        Returns (value, error, source) with source "emulator" or "simulation"
+        (error 0.0). learn=True queues new in-box points for the next refit.
+        """
+        u = self._unit(point)
+        outside = np.any(u < 0) or np.any(u > 1)
+        if isinstance(point, HVSParams) and self._off_axis(point):
+            outside = True
+        if not outside:
+            mean, err = self.predict(u * (self.hi - self.lo) + self.lo)
+            if err <= tol:
+                return mean, err, "emulator"
+
+        params = point if isinstance(point, HVSParams) else self._to_params(u)
+        key = astuple(params)
+        if key in self._memo:
+            return self._memo[key], 0.0, "simulation"
+        df = simulate_hvs(params, self.enable_sync, self.T, self.dt)
+        self.n_simulated += 1
+        res = {c: df[c].to_numpy()[:, None] for c in ("E", "V_gap", "R_int")}
+        value = float(OUTPUTS[self.output](res)[0])
+        self._memo[key] = value
+        if learn and not outside and not np.any(np.all(np.isclose(self.X, u), axis=1)):
+            self._pending.append((u, value))
+            if len(self._pending) >= self.refit_every:
+                self.flush()
+        return value, 0.0, "simulation"
+
+if __name__ == "__main__":
+    import time
+    emu = HVSEmulator({"alpha": (0.2, 1.0), "kappa": (0.2, 0.8), "V_source": (4.0, 8.0)},
+                      output="E_final").fit(40).refine(rounds=4)
+    print(f"training runs: {len(emu.y)}, LOO RMSE: {emu.loo_rmse:.2e}")
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        emu.predict({"alpha": 0.5, "kappa": 0.45, "V_source": 6.0})
+    print(f"query: {(time.perf_counter() - t0) * 1e3:.1f} us")
+    print(emu.query(HVSParams(alpha=0.5, kappa=0.45, V_source=6.0), tol=1e-3))
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""
+Importable handle on "Tantric Engineering Simulator v2.1.py".
+The file name has spaces, so other modules (and process-pool workers) use:
+    from hvs_engine import HVSParams, PRESETS, simulate_hvs, simulate_hvs_batch
+The script is executed into this module's namespace, so its classes and
+functions pickle as `hvs_engine.<name>`.
+"""
+
+import os
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "Tantric Engineering Simulator v2.1.py")
+
+with open(SOURCE_PATH, "r", encoding="utf-8") as _fh:
+    exec(compile(_fh.read(), SOURCE_PATH, "exec"), globals())
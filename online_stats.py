@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Reduction-Only Ensemble Runs (online statistics instead of trajectories)
+- Per time step and variable: Welford/Chan mean & variance, min/max,
+  fixed-range histogram (quantile sketch) and threshold-exceedance counts.
+- Per run: final values and whether each threshold was ever crossed.
+- Tantric / HVS runs report "R_int_structural" (the OS-updated base) and
+  "R_int_actual" (base + transient rebound), as simulate_ensemble and sim_stream do.
+- Lanes are simulated `chunk` at a time, so memory depends on the chunk size
+  and the time grid, not on the ensemble size (apart from the per-run finals,
+  which can be switched off).
+- Partial results merge exactly: counts, histograms and extremes are integer /
+  order-free; moments combine with Chan's formula (equal up to rounding).
+
+Usage:
+    stats = reduce_tantric(TantricParams(), n_runs=1_000_000)
+    stats["E"].mean, stats["E"].std(), stats["E"].quantile(0.9)
+    # workers: reduce_tantric(..., chunks=range(k, n_chunks, n_workers)); merge_all(parts)
+
+Tested with: Python 3.10+, numpy
+"""
+
+import numpy as np
+
+from tantric_sim import TantricParams, ensemble_step, init_ensemble_state
+from hvs_engine import hvs_init_state, hvs_rebound, hvs_step, stack_hvs_params
+from BioTransformerCore import BioTransformerBatch
+
+# ========== 1. Accumulators ==========
+
+class StepStats:
+    """Streaming statistics of one variable at each of `steps` time points."""
+    def __init__(self, steps, lo, hi, bins=256, thresholds=()):
+        self.lo, self.hi, self.bins = float(lo), float(hi), int(bins)
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        self.count = np.zeros(steps, dtype=np.int64)
+        self.mean = np.zeros(steps)
+        self.M2 = np.zeros(steps)
+        self.min = np.full(steps, np.inf)
+        self.max = np.full(steps, -np.inf)
+        # bins + underflow (0) + overflow (bins + 1)
+        self.hist = np.zeros((steps, self.bins + 2), dtype=np.int64)
+        self.exceed = np.zeros((len(self.thresholds), steps), dtype=np.int64)
+
+    def update(self, i, x):
+        """Add the lane values x observed at step i."""
+        x = np.asarray(x, dtype=np.float64)
+        nb = x.size
+        if nb == 0:
+            return
+        mb = x.mean()
+        M2b = np.square(x - mb).sum()
+        na = self.count[i]
+        n = na + nb
+        delta = mb - self.mean[i]
+        self.mean[i] += delta * nb / n
+        self.M2[i] += M2b + delta * delta * na * nb / n
+        self.count[i] = n
+        self.min[i] = min(self.min[i], x.min())
+        self.max[i] = max(self.max[i], x.max())
+
+        width = (self.hi - self.lo) / self.bins
+        idx = np.clip(np.floor((x - self.lo) / width).astype(np.int64) + 1, 0, self.bins + 1)
+        self.hist[i] += np.bincount(idx, minlength=self.bins + 2)
+        if len(self.thresholds):
+            self.exceed[:, i] += (x[None, :] > self.thresholds[:, None]).sum(axis=1)
+
+    def merge(self, other: "StepStats") -> "StepStats":
+        """Combine with statistics of disjoint lanes (in place)."""
+        na, nb = self.count, other.count
+        n = na + nb
+        safe = np.where(n > 0, n, 1)
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * nb / safe
+        self.M2 = self.M2 + other.M2 + delta * delta * na * nb / safe
+        self.count = n
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.hist = self.hist + other.hist
+        self.exceed = self.exceed + other.exceed
+        return self
+
+    def var(self, ddof=0):
+        return self.M2 / np.maximum(self.count - ddof, 1)
+
+    def std(self, ddof=0):
+        return np.sqrt(self.var(ddof))
+
+    def quantile(self, q):
+        """Per-step quantile from the histogram (error <= one bin width inside [lo, hi])."""
+        cdf = np.cumsum(self.hist, axis=1)
+        target = q * self.count
+        k = np.array([np.searchsorted(row, tq, side="left") for row, tq in zip(cdf, target)])
+        width = (self.hi - self.lo) / self.bins
+        prev = np.where(k > 0, cdf[np.arange(len(k)), np.maximum(k - 1, 0)], 0)
+        in_bin = self.hist[np.arange(len(k)), k]
+        frac = np.where(in_bin > 0, (target - prev) / np.maximum(in_bin, 1), 0.5)
+        val = self.lo + (k - 1 + frac) * width
+        return np.clip(val, self.min, self.max)  # under/overflow bins fall back to extremes
+
+class EnsembleStats:
+    """StepStats per variable, plus per-run finals and ever-crossed counts."""
+    def __init__(self, t, ranges: dict, bins=256, thresholds=None, keep_finals=True):
+        thresholds = thresholds or {}
+        self.t = np.asarray(t)
+        self.vars = {name: StepStats(len(self.t), lo, hi, bins, thresholds.get(name, ()))
+                     for name, (lo, hi) in ranges.items()}
+        self.thresholds = {name: np.asarray(thresholds.get(name, ()), dtype=float) for name in ranges}
+        self.runs_crossed = {name: np.zeros(len(th), dtype=np.int64) for name, th in self.thresholds.items()}
+        self.keep_finals = keep_finals
+        self.finals = {name: {} for name in ranges}  # name -> {chunk index: finals}
+        self.n_runs = 0
+
+    def __getitem__(self, name) -> StepStats:
+        return self.vars[name]
+
+    def add_chunk_result(self, k, crossed: dict, finals: dict, n):
+        self.n_runs += n
+        for name, flags in crossed.items():
+            self.runs_crossed[name] += flags.sum(axis=1)
+        if self.keep_finals:
+            for name, vals in finals.items():
+                self.finals[name][k] = np.array(vals, dtype=np.float64)
+
+    def final_values(self, name) -> np.ndarray:
+        """Per-run finals in run-id order (chunk order), whatever order chunks were merged in."""
+        parts = self.finals[name]
+        return np.concatenate([parts[k] for k in sorted(parts)]) if parts else np.empty(0)
+
+    def merge(self, other: "EnsembleStats") -> "EnsembleStats":
+        for name, st in self.vars.items():
+            st.merge(other.vars[name])
+            self.runs_crossed[name] += other.runs_crossed[name]
+            self.finals[name].update(other.finals[name])
+        self.n_runs += other.n_runs
+        return self
+
+def merge_all(parts) -> EnsembleStats:
+    parts = list(parts)
+    total = parts[0]
+    for p in parts[1:]:
+        total.merge(p)
+    return total
+
+# ========== 2. Reduction Runs ==========
+
+def _run_chunks(stats, n_lanes, chunk, chunks, make_chunk, record_every=1):
+    """
+    Drive `make_chunk(k, a, b)` -> iterator of (step_index, {name: lane values})
+    for the selected chunk numbers and fold everything into `stats`.
+    """
+    spans = [(a, min(a + chunk, n_lanes)) for a in range(0, n_lanes, chunk)]
+    for k in (range(len(spans)) if chunks is None else chunks):
+        a, b = spans[k]
+        crossed = {name: np.zeros((len(th), b - a), dtype=bool) for name, th in stats.thresholds.items()}
+        last = {}
+        for i, values in make_chunk(k, a, b):
+            for name, x in values.items():
+                if (i + 1) % record_every == 0:  # same rows as BioTransformerBatch.run
+                    stats.vars[name].update((i + 1) // record_every - 1, x)
+                th = stats.thresholds[name]
+                if len(th):
+                    crossed[name] |= x[None, :] > th[:, None]
+            last = values
+        stats.add_chunk_result(k, crossed, last, b - a)
+    return stats
+
+def reduce_tantric(params: TantricParams, n_runs: int, T: float = 120.0, dt: float = 0.1, seed: int = 42,
+                   chunk: int = 4096, chunks=None, bins: int = 256, thresholds=None, keep_finals=True,
+                   dtype=np.float64) -> EnsembleStats:
+    """
+    Online statistics of E, V_gap, R_int_structural, R_int_actual for simulate_ensemble lanes.
+    Chunk k uses child k of SeedSequence(seed), as shm_pool.run_ensemble_shared does,
+    so splitting `chunks` across workers and merging gives the single-process result.
+    Default thresholds: V_gap > sync_threshold and |E| near E_max (E > 0.95 E_max).
+    """
+    steps = int(T / dt) + 1
+    t_axis = np.arange(steps) * dt
+    if thresholds is None:
+        thresholds = {"V_gap": [params.sync_threshold], "E": [0.95 * params.E_max]}
+    ranges = {"E": (-params.E_max, params.E_max),
+              "V_gap": (0.0, max(params.V_source, params.sync_threshold)),
+              "R_int_structural": (0.0, params.R_int_base_init),
+              "R_int_actual": (0.0, params.R_int_base_init + 0.2)}
+    stats = EnsembleStats(t_axis, ranges, bins, thresholds, keep_finals)
+    n_chunks = -(-n_runs // chunk)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    def make_chunk(k, a, b):
+        rng = np.random.default_rng(seeds[k])
+        state = init_ensemble_state(params, b - a, dtype)
+        for i in range(steps):
+            noise = rng.normal(0.0, 1.0, b - a).astype(dtype, copy=False)
+            R_int, _ = ensemble_step(params, t_axis[i], dt, state, noise)
+            yield i, {"E": state["E"], "V_gap": state["V_gap"],
+                      "R_int_structural": state["R_int_base"], "R_int_actual": R_int}
+
+    return _run_chunks(stats, n_runs, chunk, chunks, make_chunk)
+
+def reduce_hvs(params_list, enable_sync=True, T: float = 100.0, dt: float = 0.1, chunk: int = 4096,
+               chunks=None, bins: int = 256, thresholds=None, keep_finals=True,
+               dtype=np.float64) -> EnsembleStats:
+    """Online statistics of E, V_gap, R_int_structural, R_int_actual for simulate_hvs_batch lanes."""
+    n = len(params_list)
+    steps = int(T / dt) + 1
+    t_axis = np.linspace(0, T, steps)
+    sync = np.broadcast_to(np.asarray(enable_sync, dtype=bool), (n,))
+    if thresholds is None:
+        thresholds = {"V_gap": [3.0], "E": [9.5]}
+    ranges = {"E": (-10.0, 10.0),
+              "V_gap": (0.0, max(max(p.V_source for p in params_list), 3.0)),
+              "R_int_structural": (0.0, max(p.R_int_base for p in params_list)),
+              "R_int_actual": (0.0, max(p.R_int_base for p in params_list) + 0.2)}
+    stats = EnsembleStats(t_axis, ranges, bins, thresholds, keep_finals)
+
+    def make_chunk(k, a, b):
+        lanes = stack_hvs_params(params_list[a:b], dtype)
+        state = hvs_init_state(lanes, dtype)
+        for i, t in enumerate(t_axis):
+            hvs_step(lanes, t, dt, state, sync[a:b])
+            yield i, {"E": state["E"], "V_gap": state["V_gap"],
+                      "R_int_structural": state["R_int_base"], "R_int_actual": state["R_int_base"] + hvs_rebound(t)}
+
+    return _run_chunks(stats, n, chunk, chunks, make_chunk)
+
+def reduce_bio(n_lanes: int, acceptance=0.9, maintenance_effort=0.8, n_steps: int = 60000,
+               record_every: int = 100, chunk: int = 4096, chunks=None, bins: int = 256,
+               ranges=None, thresholds=None, keep_finals=True, dtype=np.float64) -> EnsembleStats:
+    """
+    Online statistics of BioTransformerBatch lanes, recorded after every
+    `record_every`-th step (the rows of BioTransformerBatch.run, ending at n_steps*dt).
+    acceptance / maintenance_effort may be per-lane arrays of length n_lanes.
+    Histogram ranges are not known a priori here; pass `ranges` for sharp quantiles.
+    """
+    acc = np.broadcast_to(np.asarray(acceptance, dtype=float), (n_lanes,))
+    eff = np.broadcast_to(np.asarray(maintenance_effort, dtype=float), (n_lanes,))
+    n_rec = n_steps // record_every
+    t_axis = np.arange(1, n_rec + 1) * record_every * BioTransformerBatch(1).dt
+    ranges = ranges or {"Aging": (0.0, 5e5), "Resistance": (0.0, 1.0),
+                        "Turbine_Speed": (0.0, 2e3), "Wick_Tilt": (0.0, 90.0)}
+    stats = EnsembleStats(t_axis, ranges, bins, thresholds, keep_finals)
+
+    def make_chunk(k, a, b):
+        core = BioTransformerBatch(b - a, dtype)
+        for i in range(n_rec * record_every):
+            status = core.update(acc[a:b], eff[a:b])
+            yield i, {name: status[name] for name in ranges}
+
+    return _run_chunks(stats, n_lanes, chunk, chunks, make_chunk, record_every)
+
+if __name__ == "__main__":
+    stats = reduce_tantric(TantricParams(), n_runs=50_000)
+    E = stats["E"]
+    print(f"runs={stats.n_runs}  E(t=T): mean={E.mean[-1]:.4f} std={E.std()[-1]:.4f} "
+          f"q10/q50/q90={E.quantile(0.1)[-1]:.3f}/{E.quantile(0.5)[-1]:.3f}/{E.quantile(0.9)[-1]:.3f}")
+    print(f"runs with V_gap > sync_threshold at some step: {stats.runs_crossed['V_gap'][0]}")
+
+    # Split over two "workers" (interleaved chunks) and merge: same as one process
+    p = TantricParams()
+    full = reduce_tantric(p, 3000, chunk=500)
+    merged = merge_all(reduce_tantric(p, 3000, chunk=500, chunks=range(k, 6, 2)) for k in range(2))
+    for name, st in full.vars.items():
+        assert np.array_equal(full.final_values(name), merged.final_values(name)), name
+        assert np.array_equal(st.count, merged[name].count) and np.array_equal(st.hist, merged[name].hist)
+        assert np.allclose(st.mean, merged[name].mean) and np.allclose(st.M2, merged[name].M2)
+        assert np.array_equal(full.runs_crossed[name], merged.runs_crossed[name])
+    print("split-and-merge == single process: OK")
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Phase-Resistance Landscape (Manifestation Time over y_amp x Resistance)
+- Same phase dynamics as `simulate_phase_trajectory` in Tantra Engineering.py:
+      d_phi = (OMEGA_0 + KAPPA_1*y - GAMMA*R) dt + NOISE_STD dW
+- Cells start from the drift/diffusion analytic estimate (first passage of a
+  drifted Brownian motion) and are only refined + Monte-Carlo simulated near
+  the "never manifests within horizon" boundary.
+- Cell results are cached by (level, i, j) on a fixed root domain, so zooming
+  and re-rendering only evaluate cells that were never seen before.
+- `simulate_phase_batch(..., bridge=True)` detects threshold crossings between
+  grid points with the Brownian-bridge probability exp(-2(a-x0)(a-x1)/(sigma^2 dt))
+  and samples the exact crossing time, so hit times stay unbiased at coarse dt
+  (`hit_time_bias` reports the bias removed against a fine-step reference).
+
+Tested with: Python 3.10+, numpy, scipy, matplotlib
+"""
+
+from dataclasses import dataclass
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.special import ndtr
+
+# ========== 1. Physics (mirrors Tantra Engineering.py) ==========
+
+OMEGA_0 = 0.3       # Natural Flow
+KAPPA_1 = 1.8       # Intent Efficiency
+GAMMA   = 2.5       # Resistance Factor (Brake)
+NOISE_STD = 0.2     # Quantum Fluctuations
+PHI_CRITICAL = 6.0  # Reality Threshold
+
+def phase_drift(y_amp, resistance):
+    return OMEGA_0 + KAPPA_1 * np.asarray(y_amp) - GAMMA * np.asarray(resistance)
+
+def analytic_hit_probability(y_amp, resistance, horizon):
+    """
+    P(first passage of phi to PHI_CRITICAL before `horizon`) for
+    phi_t = mu*t + sigma*W_t (inverse-Gaussian CDF).
+    """
+    mu = phase_drift(y_amp, resistance)
+    s = NOISE_STD * np.sqrt(horizon)
+    a = PHI_CRITICAL
+    with np.errstate(over="ignore", invalid="ignore"):
+        term2 = np.exp(np.clip(2 * mu * a / NOISE_STD**2, None, 700.0)) * ndtr((-mu * horizon - a) / s)
+    return np.clip(ndtr((mu * horizon - a) / s) + np.nan_to_num(term2), 0.0, 1.0)
+
+def analytic_hit_time(y_amp, resistance):
+    """Mean first-passage time a/mu (inf where the drift is not positive)."""
+    mu = phase_drift(y_amp, resistance)
+    with np.errstate(divide="ignore"):
+        return np.where(mu > 0, PHI_CRITICAL / np.where(mu > 0, mu, 1.0), np.inf)
+
+def bridge_hit_probability(x0, x1, dt):
+    """
+    P(a Brownian path with variance NOISE_STD^2 per unit time, pinned at x0 and
+    x1 over one step dt, touched PHI_CRITICAL in between). Independent of drift.
+    """
+    a = PHI_CRITICAL
+    gap = np.maximum(a - x0, 0.0) * np.maximum(a - x1, 0.0)
+    return np.exp(-2.0 * gap / (NOISE_STD**2 * dt))
+
+def bridge_hit_time(x0, x1, dt, rng):
+    """
+    Sample the first-passage offset in (0, dt) of the bridge x0 -> x1, given that
+    it touches PHI_CRITICAL. With s the offset, u = s / (dt - s) is inverse-Gaussian
+    with mean b / |y - b| and shape b^2 / dt (b = (a - x0)/sigma, y = (x1 - x0)/sigma).
+    """
+    b = (PHI_CRITICAL - x0) / NOISE_STD
+    y = (x1 - x0) / NOISE_STD
+    u = rng.wald(b / np.maximum(np.abs(y - b), 1e-12), np.maximum(b * b / dt, 1e-300))
+    return dt * u / (1.0 + u)
+
+def simulate_phase_batch(y_amp, resistance, n_paths=256, steps=800, dt=0.01, rng=None, bridge=False):
+    """
+    Vectorized `simulate_phase_trajectory` for many paths.
+    y_amp / resistance may be scalars or arrays broadcastable to (n_paths,).
+    Returns first hit times (NaN where the path never manifests).
+
+    bridge=False: grid check phi >= PHI_CRITICAL, hit time = grid time (as in
+                  simulate_phase_trajectory; late and under-counted at coarse dt).
+    bridge=True:  between grid points a crossing is also detected with the
+                  Brownian-bridge probability, and every hit is timed by sampling
+                  the bridge's first-passage time, so coarse dt stays unbiased.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    drift = np.broadcast_to(phase_drift(y_amp, resistance), (n_paths,)).astype(float)
+    phi = np.zeros(n_paths)
+    hit_t = np.full(n_paths, np.nan)
+    for i in range(1, steps):
+        prev = phi
+        phi = phi + drift * dt + rng.normal(0.0, NOISE_STD * np.sqrt(dt), n_paths)
+        if not bridge:
+            new_hit = np.isnan(hit_t) & (phi >= PHI_CRITICAL)
+            hit_t[new_hit] = i * dt
+            continue
+        live = np.nonzero(np.isnan(hit_t))[0]
+        x0, x1 = prev[live], phi[live]
+        crossed = x1 >= PHI_CRITICAL
+        below = np.nonzero(~crossed)[0]
+        crossed[below] = rng.uniform(size=below.size) < bridge_hit_probability(x0[below], x1[below], dt)
+        sel = live[crossed]
+        if sel.size:
+            hit_t[sel] = (i - 1) * dt + bridge_hit_time(prev[sel], phi[sel], dt, rng)
+    return hit_t
+
+def hit_time_bias(y_amp, resistance, dt=0.2, dt_ref=0.001, horizon=8.0, n_paths=20_000, seed=0):
+    """
+    Grid-check vs bridge-corrected detection at step `dt`, against a grid-check
+    reference at fine step `dt_ref` over the same horizon (a multiple of both steps).
+    Returns a dict of p_hit / mean t_hit per method and the bias removed.
+    """
+    def run(step, bridge, k):
+        steps = int(round(horizon / step)) + 1
+        hits = simulate_phase_batch(y_amp, resistance, n_paths, steps, step,
+                                    np.random.default_rng([seed, k]), bridge)
+        ok = ~np.isnan(hits)
+        return float(ok.mean()), float(hits[ok].mean()) if ok.any() else np.nan
+
+    ref, grid, brg = run(dt_ref, False, 0), run(dt, False, 1), run(dt, True, 2)
+    return {
+        "p_ref": ref[0], "p_grid": grid[0], "p_bridge": brg[0],
+        "p_analytic": float(analytic_hit_probability(y_amp, resistance, horizon)),
+        "t_ref": ref[1], "t_grid": grid[1], "t_bridge": brg[1],
+        "t_bias_grid": grid[1] - ref[1], "t_bias_bridge": brg[1] - ref[1],
+        "p_bias_grid": grid[0] - ref[0], "p_bias_bridge": brg[0] - ref[0],
+    }
+
+# ========== 2. Adaptive Landscape ==========
+
+@dataclass
+class LandscapeConfig:
+    y_range: tuple = (0.0, 4.0)     # Root domain (fixed so cell ids are stable)
+    R_range: tuple = (0.0, 3.0)
+    base_level: int = 3             # Uniform 2^L x 2^L start grid
+    max_level: int = 7              # Finest refinement near the boundary (default view)
+    boundary_tol: float = 0.02      # Cell is "settled" if all corners have p<tol or p>1-tol
+    steps: int = 800                # Same horizon as simulate_phase_trajectory
+    dt: float = 0.01
+    n_paths: int = 256              # Monte-Carlo paths per boundary leaf
+    bridge: bool = False            # Bridge-corrected hits (allows e.g. steps=41, dt=0.2)
+    seed: int = 0
+
+class PhaseLandscape:
+    def __init__(self, cfg: LandscapeConfig = None):
+        self.cfg = cfg or LandscapeConfig()
+        # Last grid time of simulate_phase_batch (steps 0..steps-1), so analytic
+        # and Monte-Carlo cells describe the same horizon
+        self.horizon = (self.cfg.steps - 1) * self.cfg.dt
+        self.cells = {}       # (level, i, j) -> result dict (the cache)
+        self.n_simulated = 0  # Monte-Carlo cells run so far
+
+    def cell_bounds(self, level, i, j):
+        (y0, y1), (r0, r1) = self.cfg.y_range, self.cfg.R_range
+        hy, hr = (y1 - y0) / 2**level, (r1 - r0) / 2**level
+        return y0 + i * hy, y0 + (i + 1) * hy, r0 + j * hr, r0 + (j + 1) * hr
+
+    def _evaluate(self, level, i, j):
+        key = (level, i, j)
+        if key in self.cells:
+            return self.cells[key]
+        ya, yb, ra, rb = self.cell_bounds(level, i, j)
+        corners = analytic_hit_probability(np.array([ya, ya, yb, yb]),
+                                           np.array([ra, rb, ra, rb]), self.horizon)
+        yc, rc = 0.5 * (ya + yb), 0.5 * (ra + rb)
+        tol = self.cfg.boundary_tol
+        settled = bool(np.all(corners < tol) or np.all(corners > 1 - tol))
+        res = {
+            "settled": settled,
+            "p_hit": float(analytic_hit_probability(yc, rc, self.horizon)),
+            "t_hit": float(analytic_hit_time(yc, rc)),
+            "source": "analytic",
+        }
+        self.cells[key] = res
+        return res
+
+    def _simulate(self, level, i, j):
+        """Monte-Carlo refinement of a boundary leaf (cached like the analytic estimate)."""
+        res = self.cells[(level, i, j)]
+        if res["source"] == "mc":
+            return res
+        ya, yb, ra, rb = self.cell_bounds(level, i, j)
+        yc, rc = 0.5 * (ya + yb), 0.5 * (ra + rb)
+        rng = np.random.default_rng([self.cfg.seed, level, i, j])
+        hits = simulate_phase_batch(yc, rc, self.cfg.n_paths, self.cfg.steps, self.cfg.dt, rng,
+                                    self.cfg.bridge)
+        ok = ~np.isnan(hits)
+        res.update(p_hit=float(ok.mean()),
+                   t_hit=float(hits[ok].mean()) if ok.any() else np.inf,
+                   source="mc")
+        self.n_simulated += 1
+        return res
+
+    def leaves(self, window=None, max_level=None):
+        """
+        Leaf cells intersecting `window` = ((y0, y1), (R0, R1)).
+        Refines (and caches) only unsettled cells down to `max_level`
+        (raise it when zooming in); unsettled leaves are Monte-Carlo simulated.
+        """
+        max_level = self.cfg.max_level if max_level is None else max_level
+        (wy0, wy1), (wr0, wr1) = window or (self.cfg.y_range, self.cfg.R_range)
+        L = self.cfg.base_level
+        stack = [(L, i, j) for i in range(2**L) for j in range(2**L)]
+        out = []
+        while stack:
+            level, i, j = stack.pop()
+            ya, yb, ra, rb = self.cell_bounds(level, i, j)
+            if yb <= wy0 or ya >= wy1 or rb <= wr0 or ra >= wr1:
+                continue
+            res = self._evaluate(level, i, j)
+            if res["settled"]:
+                out.append(((level, i, j), res))
+            elif level >= max_level:
+                out.append(((level, i, j), self._simulate(level, i, j)))
+            else:
+                stack.extend((level + 1, 2 * i + di, 2 * j + dj) for di in (0, 1) for dj in (0, 1))
+        return out
+
+    def render(self, window=None, resolution=256, max_level=None):
+        """
+        Rasterize the leaves onto a resolution x resolution image.
+        Returns (extent, t_hit image, p_hit image); t_hit is NaN where p_hit < 0.5.
+        """
+        (wy0, wy1), (wr0, wr1) = window or (self.cfg.y_range, self.cfg.R_range)
+        T_img = np.full((resolution, resolution), np.nan)
+        P_img = np.zeros((resolution, resolution))
+        # Pixel centers; a pixel takes the value of the leaf containing its center
+        ys = wy0 + (np.arange(resolution) + 0.5) * (wy1 - wy0) / resolution
+        rs = wr0 + (np.arange(resolution) + 0.5) * (wr1 - wr0) / resolution
+        for (level, i, j), res in self.leaves(window, max_level):
+            ya, yb, ra, rb = self.cell_bounds(level, i, j)
+            ci = slice(np.searchsorted(ys, ya), np.searchsorted(ys, yb))
+            cj = slice(np.searchsorted(rs, ra), np.searchsorted(rs, rb))
+            P_img[cj, ci] = res["p_hit"]
+            if res["p_hit"] >= 0.5:
+                T_img[cj, ci] = res["t_hit"]
+        return (wy0, wy1, wr0, wr1), T_img, P_img
+
+# ========== 3. Visualization ==========
+
+def plot_landscape(landscape: PhaseLandscape, window=None, resolution=256, max_level=None):
+    extent, T_img, P_img = landscape.render(window, resolution, max_level)
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(13, 5))
+    im1 = ax1.imshow(T_img, origin="lower", extent=extent, aspect="auto", cmap="magma_r")
+    ax1.set_title("Manifestation Time (first passage)")
+    fig.colorbar(im1, ax=ax1, label="Time")
+    im2 = ax2.imshow(P_img, origin="lower", extent=extent, aspect="auto", cmap="viridis", vmin=0, vmax=1)
+    ax2.set_title(f"P(manifest within horizon={landscape.horizon:g})")
+    fig.colorbar(im2, ax=ax2, label="Probability")
+    for ax in (ax1, ax2):
+        ax.set_xlabel("Intent amplitude y_amp")
+        ax.set_ylabel("Resistance R")
+    plt.tight_layout()
+    plt.show()
+
+if __name__ == "__main__":
+    for dt in (0.05, 0.2, 0.5):
+        r = hit_time_bias(1.5, 0.9, dt=dt)
+        print(f"dt={dt}: t_hit bias grid {r['t_bias_grid']:+.4f} -> bridge {r['t_bias_bridge']:+.4f}, "
+              f"p_hit bias grid {r['p_bias_grid']:+.4f} -> bridge {r['p_bias_bridge']:+.4f}")
+    land = PhaseLandscape()
+    plot_landscape(land)
+    print(f"Cells cached: {len(land.cells)}, Monte-Carlo cells: {land.n_simulated}")
+    # Zoom: only new cells inside the window are evaluated
+    plot_landscape(land, window=((1.0, 2.5), (1.0, 2.0)), resolution=512, max_level=10)
+    print(f"Cells cached: {len(land.cells)}, Monte-Carlo cells: {land.n_simulated}")
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Process-Pool Runs with Zero-Copy Shared-Memory Results
+- The parent preallocates one multiprocessing.shared_memory segment per output
+  array (trajectories + per-run summaries).
+- Workers attach once (pool initializer) and write their lane chunk in place
+  through the `out=` buffers of simulate_ensemble / simulate_hvs_batch.
+- Only (first_lane, last_lane, seconds) crosses the pipe; the parent views
+  the arrays without copying or unpickling.
+- The parent owns and unlinks every segment, also when a worker raises or dies.
+- Arrays taken from a result (res["E"]) may outlive it: leaving `with` unlinks
+  the segments, and each one is unmapped when its last view is released. Copy
+  (np.array(res["E"])) only if you need an array independent of the segment.
+
+Usage:
+    with run_ensemble_shared(TantricParams(), n_runs=100_000, n_workers=8) as res:
+        res["E"]          # (steps, n_runs) view into shared memory
+        res["E_final"]    # (n_runs,) summary
+
+Tested with: Python 3.10+, numpy
+"""
+
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from tantric_sim import TantricParams, simulate_ensemble
+from hvs_engine import simulate_hvs_batch
+
+TANTRIC_TRAJ = ("E", "V_gap", "R_int_structural", "R_int_actual")
+HVS_TRAJ = ("E", "V_gap", "R_int", "Sync")
+SUMMARY = ("E_final", "E_peak", "V_gap_final", "R_int_final")
+
+# ========== 1. Shared Arrays ==========
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Open an existing segment in a worker. Before 3.13 attaching registers the
+    name with the resource tracker the pool workers share with the parent; that
+    is harmless because the parent unlinks (and unregisters) it exactly once.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+class _Mapping:
+    """
+    Array-interface wrapper that owns a segment. Every view built on it keeps
+    it (and so the mapping) alive; the SharedMemory closes itself once the
+    last view is garbage-collected.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, nbytes: int):
+        self.shm = shm
+        probe = np.frombuffer(shm.buf, dtype=np.uint8, count=nbytes)
+        self.__array_interface__ = {"shape": (nbytes,), "typestr": "|u1",
+                                    "data": (probe.ctypes.data, False), "version": 3}
+        del probe  # release the buffer export so close() can unmap later
+
+def _mapped_array(shm, nbytes, shape, dtype) -> np.ndarray:
+    raw = np.asarray(_Mapping(shm, nbytes))
+    return raw[:int(np.prod(shape)) * np.dtype(dtype).itemsize].view(dtype).reshape(shape)
+
+class SharedResult:
+    """
+    Named arrays backed by shared memory, created and owned by the parent.
+    Index like a dict; close() (or leaving `with`) unlinks the segments. Arrays
+    taken from the result stay valid after that: each segment is unmapped when
+    its last view is garbage-collected.
+    """
+    def __init__(self, layout: dict):
+        self._segments = {}
+        self.arrays = {}
+        try:
+            for name, (shape, dtype) in layout.items():
+                nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+                shm = shared_memory.SharedMemory(create=True, size=nbytes)
+                self._segments[name] = shm
+                self.arrays[name] = _mapped_array(shm, nbytes, shape, dtype)
+        except BaseException:
+            self.close()
+            raise
+        self.meta = {}
+
+    def handles(self) -> dict:
+        """Small picklable description workers use to attach."""
+        return {name: (shm.name, self.arrays[name].shape, self.arrays[name].dtype.str)
+                for name, shm in self._segments.items()}
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def keys(self):
+        return self.arrays.keys()
+
+    def close(self):
+        """Unlink every segment; the mappings go away with the last array view."""
+        for shm in self._segments.values():
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.arrays = {}
+        self._segments = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ========== 2. Worker Side ==========
+
+_WORKER = {}  # per-process: attached segments and array views
+
+def _init_worker(handles: dict):
+    for name, (seg, shape, dtype) in handles.items():
+        shm = _attach(seg)
+        _WORKER[name] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+def _view(name):
+    return _WORKER[name][1]
+
+def _write_summary(a, b, E, V_gap, R_int):
+    _view("E_final")[a:b] = E[-1]
+    _view("E_peak")[a:b] = E.max(axis=0)
+    _view("V_gap_final")[a:b] = V_gap[-1]
+    _view("R_int_final")[a:b] = R_int[-1]
+
+def _tantric_chunk(params, a, b, T, dt, seed, dtype):
+    t0 = time.perf_counter()
+    out = {name: _view(name)[:, a:b] for name in TANTRIC_TRAJ}
+    simulate_ensemble(params, b - a, T=T, dt=dt, seed=seed, dtype=dtype, out=out)
+    _write_summary(a, b, out["E"], out["V_gap"], out["R_int_structural"])
+    return a, b, time.perf_counter() - t0
+
+def _hvs_chunk(params_list, enable_sync, a, b, T, dt, dtype):
+    t0 = time.perf_counter()
+    out = {name: _view(name)[:, a:b] for name in HVS_TRAJ}
+    simulate_hvs_batch(params_list, enable_sync, T=T, dt=dt, dtype=dtype, out=out)
+    _write_summary(a, b, out["E"], out["V_gap"], out["R_int"])
+    return a, b, time.perf_counter() - t0
+
+# ========== 3. Parent Side ==========
+
+def _chunks(n, chunk):
+    return [(a, min(a + chunk, n)) for a in range(0, n, chunk)]
+
+def _layout(traj_names, steps, n, dtype):
+    layout = {name: ((steps, n), dtype) for name in traj_names}
+    layout.update({name: ((n,), dtype) for name in SUMMARY})
+    return layout
+
+def _run_pool(result: SharedResult, n_workers, submit_all):
+    """Run the chunk tasks; on any failure unlink the segments and re-raise."""
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(result.handles(),)) as pool:
+            futures = submit_all(pool)
+            result.meta["chunks"] = [f.result() for f in futures]
+    except BaseException:
+        result.close()
+        raise
+    return result
+
+def run_ensemble_shared(params: TantricParams, n_runs: int, T: float = 120.0, dt: float = 0.1,
+                        seed: int = 42, dtype=np.float64, n_workers: int = None, chunk: int = 4096):
+    """
+    simulate_ensemble over n_runs lanes split across processes.
+    Each chunk gets an independent child of SeedSequence(seed), so results do
+    not depend on n_workers (they do depend on `chunk`).
+    """
+    steps = int(T / dt) + 1
+    result = SharedResult(_layout(TANTRIC_TRAJ, steps, n_runs, dtype))
+    result.arrays["t"] = np.arange(steps) * dt
+    spans = _chunks(n_runs, chunk)
+    seeds = np.random.SeedSequence(seed).spawn(len(spans))
+
+    def submit_all(pool):
+        return [pool.submit(_tantric_chunk, params, a, b, T, dt, s, dtype)
+                for (a, b), s in zip(spans, seeds)]
+    return _run_pool(result, n_workers, submit_all)
+
+def run_hvs_shared(params_list, enable_sync=True, T: float = 100.0, dt: float = 0.1,
+                   dtype=np.float64, n_workers: int = None, chunk: int = 4096):
+    """simulate_hvs_batch over many HVSParams lanes split across processes."""
+    n = len(params_list)
+    steps = int(T / dt) + 1
+    result = SharedResult(_layout(HVS_TRAJ, steps, n, dtype))
+    result.arrays["t"] = np.linspace(0, T, steps)
+    sync = np.broadcast_to(np.asarray(enable_sync, dtype=bool), (n,))
+
+    def submit_all(pool):
+        return [pool.submit(_hvs_chunk, params_list[a:b], sync[a:b].copy(), a, b, T, dt, dtype)
+                for a, b in _chunks(n, chunk)]
+    return _run_pool(result, n_workers, submit_all)
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    with run_ensemble_shared(TantricParams(), n_runs=20_000, n_workers=4) as res:
+        print(f"{res['E'].shape} trajectories in {time.perf_counter() - t0:.2f}s, "
+              f"mean final E = {res['E_final'].mean():.4f}")
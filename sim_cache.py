@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Simulation Result Cache (content-addressed, on disk)
+- Keys are a hash of: engine function, params dataclass, all other engine
+  arguments with defaults applied (seed, horizon, dt, ...) and the engine
+  version (hash of the engine source). Integers passed for float-typed
+  arguments or fields count as floats (T=120 and T=120.0 share an entry).
+- Runs with seed=None are not reproducible and bypass the cache.
+- Results are stored column-wise as .npy files and reloaded memory-mapped.
+- Size-bounded LRU eviction; safe for several processes sharing one directory.
+
+Usage:
+    cache = ResultCache("~/.cache/tye_results", max_bytes=2 * 1024**3)
+    df = cache.run(simulate, TantricParams(), T=120.0, dt=0.1, seed=42)
+    df = cache.run(simulate_hvs, PRESETS["Buddhist"], enable_sync=True)
+    res = cache.run(simulate_scenarios, TYEConfig())
+
+Tested with: Python 3.10+, numpy, pandas
+"""
+
+import dataclasses
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, eviction is best-effort
+    fcntl = None
+
+META_FILE = "meta.json"
+
+# ========== 1. Keys ==========
+
+def engine_version(fn) -> str:
+    """Hash of the source file defining `fn` (schedules included)."""
+    try:
+        with open(inspect.getsourcefile(fn), "r", encoding="utf-8") as fh:
+            src = fh.read()
+    except (OSError, TypeError):
+        src = getattr(fn, "__qualname__", repr(fn))
+    return hashlib.sha256(src.encode("utf-8")).hexdigest()[:16]
+
+def _is_float_typed(annotation, default=None) -> bool:
+    return annotation in (float, "float") or type(default) is float
+
+def _float_if_int(value):
+    """120 -> 120.0 for float-typed slots (bools stay bools)."""
+    if isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_)):
+        return float(value)
+    return value
+
+def _canonical(value):
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        fields = dataclasses.asdict(value)
+        for f in dataclasses.fields(value):
+            if f.name in fields and _is_float_typed(f.type, f.default):
+                fields[f.name] = _float_if_int(fields[f.name])
+        return {"__dataclass__": type(value).__qualname__, "fields": _canonical(fields)}
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return {"__array__": hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest(),
+                "dtype": str(value.dtype), "shape": list(value.shape)}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float):
+        return repr(value)  # exact round-trip, 0.1 != 0.1000000001
+    return value
+
+def _bound_kwargs(fn, params, kwargs) -> dict:
+    """
+    kwargs with fn's defaults filled in, so seed / T / dt always enter the key;
+    ints given for float-typed arguments are stored as floats.
+    """
+    try:
+        sig = inspect.signature(fn)
+        bound = sig.bind(params, **kwargs)
+    except (TypeError, ValueError):  # no signature available: key on what was passed
+        return kwargs
+    bound.apply_defaults()
+    first = next(iter(bound.arguments))
+    out = {}
+    for k, v in bound.arguments.items():
+        if k == first:
+            continue
+        p = sig.parameters[k]
+        out[k] = _float_if_int(v) if _is_float_typed(p.annotation, p.default) else v
+    return out
+
+def cache_key(fn, params, version=None, **kwargs) -> str:
+    kwargs = _bound_kwargs(fn, params, kwargs)
+    payload = {
+        "engine": f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}",
+        "version": version if version is not None else engine_version(fn),
+        "params": _canonical(params),
+        "kwargs": _canonical(kwargs),
+    }
+    blob = json.dumps(payload, sort_keys=True, default=repr).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+# ========== 2. Encoding (DataFrame / dict of arrays -> .npy files) ==========
+
+def _encode(obj, entry_dir, counter):
+    def save(arr):
+        name = f"{len(counter):05d}.npy"
+        counter.append(name)
+        np.save(os.path.join(entry_dir, name), np.asarray(arr), allow_pickle=False)
+        return name
+
+    if isinstance(obj, pd.DataFrame):
+        return {"__frame__": [[str(c), save(obj[c].to_numpy())] for c in obj.columns]}
+    if isinstance(obj, dict):
+        return {"__dict__": [[k, _encode(v, entry_dir, counter)] for k, v in obj.items()]}
+    return {"__array__": save(obj)}
+
+def _decode(tree, entry_dir):
+    def load(name):
+        return np.load(os.path.join(entry_dir, name), mmap_mode="r", allow_pickle=False)
+
+    if "__frame__" in tree:
+        return pd.DataFrame({c: load(f) for c, f in tree["__frame__"]}, copy=False)
+    if "__dict__" in tree:
+        return {k: _decode(v, entry_dir) for k, v in tree["__dict__"]}
+    arr = load(tree["__array__"])
+    return arr[()] if arr.ndim == 0 else arr
+
+# ========== 3. Cache ==========
+
+class ResultCache:
+    def __init__(self, root: str, max_bytes: int = 1 << 30):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.max_bytes = int(max_bytes)
+        os.makedirs(self.root, exist_ok=True)
+
+    @contextmanager
+    def _lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.root, ".lock"), "a+") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key: str):
+        """Return the stored result (memory-mapped) or None."""
+        entry = self._entry(key)
+        try:
+            with open(os.path.join(entry, META_FILE), "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            result = _decode(meta["tree"], entry)
+            os.utime(os.path.join(entry, META_FILE))  # LRU touch
+        except (FileNotFoundError, NotADirectoryError):
+            return None  # missing, or evicted by another process mid-read
+        return result
+
+    def put(self, key: str, result):
+        """Store `result` atomically; returns the memory-mapped copy."""
+        bucket = os.path.dirname(self._entry(key))
+        os.makedirs(bucket, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=bucket)
+        try:
+            tree = _encode(result, tmp, [])
+            with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as fh:
+                json.dump({"tree": tree}, fh)
+            try:
+                os.rename(tmp, self._entry(key))
+            except OSError:
+                pass  # another process stored the same key first; keep theirs
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+        stored = self.get(key)
+        return stored if stored is not None else result
+
+    def run(self, fn, params, *, version=None, **kwargs):
+        """
+        fn(params, **kwargs) with caching.
+        The key covers every argument of fn after `params`, defaults included, so
+        run(simulate, p) and run(simulate, p, seed=42, T=120, dt=0.1) share an entry.
+        seed=None (fresh entropy per call) is run directly and never stored.
+        """
+        if _bound_kwargs(fn, params, kwargs).get("seed", 0) is None:
+            return fn(params, **kwargs)
+        key = cache_key(fn, params, version=version, **kwargs)
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        return self.put(key, fn(params, **kwargs))
+
+    def _entries(self):
+        for bucket in os.scandir(self.root):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.startswith(".") or not entry.is_dir():
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                    used = os.stat(os.path.join(entry.path, META_FILE)).st_mtime
+                except FileNotFoundError:
+                    continue
+                yield used, size, entry.path
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits `max_bytes`."""
+        with self._lock():
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                # Rename first so readers never see a half-deleted entry
+                trash = os.path.join(os.path.dirname(path), f".del-{uuid.uuid4().hex}")
+                try:
+                    os.rename(path, trash)
+                except OSError:
+                    continue
+                shutil.rmtree(trash, ignore_errors=True)
+                total -= size
+
+    def clear(self):
+        with self._lock():
+            for bucket in os.scandir(self.root):
+                if bucket.is_dir():
+                    shutil.rmtree(bucket.path, ignore_errors=True)
+
+def cached(cache: ResultCache, version=None):
+    """Decorator form: @cached(cache) def simulate(params, ...)."""
+    def wrap(fn):
+        def inner(params, **kwargs):
+            return cache.run(fn, params, version=version, **kwargs)
+        inner.__wrapped__ = fn
+        inner.__name__ = getattr(fn, "__name__", "cached")
+        inner.__doc__ = getattr(fn, "__doc__", None)
+        return inner
+    return wrap
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio Streaming Simulation API
+- `stream(stepper, chunk_steps)` is an async generator yielding fixed-size
+  chunks of steps while the run progresses (for live E / V_gap / R_int plots).
+- Backpressure: a chunk is only computed when the consumer asks for it (plus
+  at most one chunk computed ahead), so a slow dashboard pauses the run.
+- Cancellation: cancelling the consuming task or leaving the `async for`
+  stops the run after the chunk in flight.
+- Stepping runs in a thread executor, so many sessions share one event loop
+  without blocking it (NumPy releases the GIL in the array kernels). Process
+  pools are rejected: the stepper would be advanced on a pickled copy.
+- Every stepper streams "R_int_structural" (the OS-updated base) and
+  "R_int_actual" (base + transient rebound), as in simulate_ensemble.
+
+Steppers (same dynamics as the batch kernels, one chunk at a time):
+    TantricStepper(params, n_runs, T, dt, seed)   -> tantric_sim.ensemble_step
+    HVSStepper(params_list, enable_sync, T, dt)   -> hvs_engine.hvs_step
+    BioStepper(n_lanes, acceptance, effort, n)    -> BioTransformerBatch.update
+
+Tested with: Python 3.10+, numpy
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from tantric_sim import TantricParams, ensemble_step, init_ensemble_state
+from hvs_engine import hvs_init_state, hvs_rebound, hvs_step, stack_hvs_params
+from BioTransformerCore import BioTransformerBatch
+
+# ========== 1. Steppers ==========
+
+class _Stepper:
+    """Advances a run in place; `advance(n)` returns the next n steps as arrays."""
+    fields = ()
+    wide_fields = ()  # always float64, whatever the state dtype
+
+    def __init__(self, steps, n_lanes, dtype):
+        self.steps = steps
+        self.n_lanes = n_lanes
+        self.dtype = dtype
+        self.i = 0
+
+    @property
+    def done(self) -> bool:
+        return self.i >= self.steps
+
+    def _new_chunk(self, n):
+        chunk = {name: np.empty((n, self.n_lanes), dtype=np.float64 if name in self.wide_fields else self.dtype)
+                 for name in self.fields}
+        chunk["t"] = np.empty(n)
+        return chunk
+
+    def advance(self, n: int) -> dict:
+        n = min(n, self.steps - self.i)
+        chunk = self._new_chunk(n)
+        for k in range(n):
+            self._step(chunk, k)
+            self.i += 1
+        return chunk
+
+class TantricStepper(_Stepper):
+    fields = ("E", "V_gap", "R_int_structural", "R_int_actual")
+
+    def __init__(self, params: TantricParams, n_runs=1, T=120.0, dt=0.1, seed=42, dtype=np.float64):
+        super().__init__(int(T / dt) + 1, n_runs, dtype)
+        self.params = params
+        self.dt = dt
+        self.rng = np.random.default_rng(seed)
+        self.state = init_ensemble_state(params, n_runs, dtype)
+
+    def _step(self, chunk, k):
+        t = self.i * self.dt
+        noise = self.rng.normal(0.0, 1.0, self.n_lanes).astype(self.dtype, copy=False)
+        R_int, _ = ensemble_step(self.params, t, self.dt, self.state, noise)
+        chunk["t"][k] = t
+        chunk["E"][k] = self.state["E"]
+        chunk["V_gap"][k] = self.state["V_gap"]
+        chunk["R_int_structural"][k] = self.state["R_int_base"]
+        chunk["R_int_actual"][k] = R_int
+
+class HVSStepper(_Stepper):
+    fields = ("E", "V_gap", "R_int_structural", "R_int_actual")
+
+    def __init__(self, params_list, enable_sync=True, T=100.0, dt=0.1, dtype=np.float64):
+        super().__init__(int(T / dt) + 1, len(params_list), dtype)
+        self.t_axis = np.linspace(0, T, self.steps)
+        self.dt = dt
+        self.lanes = stack_hvs_params(params_list, dtype)
+        self.sync_enabled = np.broadcast_to(np.asarray(enable_sync, dtype=bool), (self.n_lanes,))
+        self.state = hvs_init_state(self.lanes, dtype)
+
+    def _step(self, chunk, k):
+        t = self.t_axis[self.i]
+        hvs_step(self.lanes, t, self.dt, self.state, self.sync_enabled)
+        chunk["t"][k] = t
+        chunk["E"][k] = self.state["E"]
+        chunk["V_gap"][k] = self.state["V_gap"]
+        chunk["R_int_structural"][k] = self.state["R_int_base"]
+        chunk["R_int_actual"][k] = self.state["R_int_base"] + hvs_rebound(t)
+
+class BioStepper(_Stepper):
+    fields = ("Aging", "Resistance", "Turbine_Speed", "Wick_Tilt")
+    # BioTransformerBatch.ACCUMULATORS (Aging, Omega -> Turbine_Speed), as in its run()
+    wide_fields = ("Aging", "Turbine_Speed")
+
+    def __init__(self, n_lanes=1, acceptance=0.9, maintenance_effort=0.8, n_steps=60000, dtype=np.float64):
+        super().__init__(n_steps, n_lanes, dtype)
+        self.core = BioTransformerBatch(n_lanes, dtype)
+        self.acceptance = acceptance
+        self.maintenance_effort = maintenance_effort
+
+    def _step(self, chunk, k):
+        status = self.core.update(self.acceptance, self.maintenance_effort)
+        chunk["t"][k] = (self.i + 1) * self.core.dt
+        for name in self.fields:
+            chunk[name][k] = status[name]
+
+# ========== 2. Async Streaming ==========
+
+async def stream(stepper: _Stepper, chunk_steps: int = 100, executor=None, prefetch: bool = True):
+    """
+    Async generator of chunks (dicts of (n, n_lanes) arrays plus "t").
+    executor: ThreadPoolExecutor for the stepping (None = loop default). The
+              stepper advances in place, so it must share this process.
+    prefetch: compute the next chunk while the consumer handles this one.
+    """
+    if executor is not None and not isinstance(executor, ThreadPoolExecutor):
+        raise TypeError("stream() needs a ThreadPoolExecutor (or None): the stepper "
+                        f"advances in place and cannot run in a {type(executor).__name__}")
+    loop = asyncio.get_running_loop()
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                if stepper.done:
+                    return
+                pending = loop.run_in_executor(executor, stepper.advance, chunk_steps)
+            chunk = await pending
+            pending = None
+            if prefetch and not stepper.done:
+                pending = loop.run_in_executor(executor, stepper.advance, chunk_steps)
+            yield chunk
+    finally:
+        # Consumer left or was cancelled: drop the chunk in flight (if any).
+        if pending is not None:
+            pending.cancel()
+
+async def collect(stepper: _Stepper, chunk_steps: int = 100, executor=None) -> dict:
+    """Drain a stream into full arrays (mainly for checks against the batch runs)."""
+    parts = [chunk async for chunk in stream(stepper, chunk_steps, executor)]
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+if __name__ == "__main__":
+    from hvs_engine import PRESETS
+
+    async def dashboard(name, stepper, delay):
+        async for chunk in stream(stepper, chunk_steps=200):
+            await asyncio.sleep(delay)  # slow consumer: the run waits for it
+            print(f"[{name}] t={chunk['t'][-1]:6.1f}  E={chunk['E'][-1].mean():+.3f}  "
+                  f"V_gap={chunk['V_gap'][-1].mean():.3f}  R_int={chunk['R_int_actual'][-1].mean():.3f}")
+
+    async def main():
+        await asyncio.gather(
+            dashboard("tantric", TantricStepper(TantricParams(), n_runs=1000), 0.05),
+            dashboard("buddhist", HVSStepper([PRESETS["Buddhist"]]), 0.1),
+        )
+
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+# --- 5. Multi-Tenant Kernel Pool ---
+class LoveOSKernelPool:
+    """
+    Many LoveOSKernel instances packed into contiguous arrays.
+    Row i of every array is one user; `ids[i]` is that user's id.
+    One call to `step(x, y)` advances every user by one day.
+    """
+    # Per-user copies of the PhysicsConfig fields used by the kernel
+    CFG_FIELDS = ("alpha", "beta", "dt", "critical_area",
+                  "base_kappa", "awakened_kappa", "transition_speed")
+
+    def __init__(self, capacity=1024):
+        self.n = 0
+        self._next_id = 0
+        self._row = {}  # user id -> row
+        self._alloc(max(1, int(capacity)))
+
+    def _alloc(self, capacity):
+        old_n = self.n
+        def grow(arr, dtype):
+            new = np.zeros(capacity, dtype=dtype)
+            if arr is not None:
+                new[:old_n] = arr[:old_n]
+            return new
+        self.ids = grow(getattr(self, "ids", None), np.int64)
+        self.t = grow(getattr(self, "t", None), np.int64)
+        self.A_accumulated = grow(getattr(self, "A_accumulated", None), np.float64)
+        self.m = grow(getattr(self, "m", None), np.float64)
+        for f in self.CFG_FIELDS:
+            setattr(self, f, grow(getattr(self, f, None), np.float64))
+        self.capacity = capacity
+
+    def add_users(self, count=1, cfg=None):
+        """
+        Add `count` fresh users sharing one PhysicsConfig (a group).
+        Returns the new user ids.
+        """
+        cfg = cfg if cfg is not None else PhysicsConfig()
+        count = int(count)
+        if self.n + count > self.capacity:
+            self._alloc(max(self.n + count, 2 * self.capacity))
+
+        rows = slice(self.n, self.n + count)
+        new_ids = np.arange(self._next_id, self._next_id + count, dtype=np.int64)
+        self.ids[rows] = new_ids
+        self.t[rows] = 0
+        self.A_accumulated[rows] = 0.0
+        self.m[rows] = 0.0
+        for f in self.CFG_FIELDS:
+            getattr(self, f)[rows] = getattr(cfg, f)
+
+        self._row.update(zip(new_ids.tolist(), range(self.n, self.n + count)))
+        self._next_id += count
+        self.n += count
+        return new_ids
+
+    def set_config(self, user_ids, cfg):
+        """Assign a PhysicsConfig to existing users (per user or per group)."""
+        rows = self.rows(user_ids)
+        for f in self.CFG_FIELDS:
+            getattr(self, f)[rows] = getattr(cfg, f)
+
+    def remove_users(self, user_ids):
+        """Remove users; the last rows are moved into the freed slots."""
+        for uid in np.atleast_1d(user_ids).tolist():
+            row = self._row.pop(uid)
+            last = self.n - 1
+            if row != last:
+                moved = int(self.ids[last])
+                for name in ("ids", "t", "A_accumulated", "m") + self.CFG_FIELDS:
+                    arr = getattr(self, name)
+                    arr[row] = arr[last]
+                self._row[moved] = row
+            self.n = last
+
+    def rows(self, user_ids):
+        """Row indices for the given user ids."""
+        return np.array([self._row[uid] for uid in np.atleast_1d(user_ids).tolist()],
+                        dtype=np.int64)
+
+    def step(self, x_t, y_t):
+        """
+        Advance every user by one time-step.
+        x_t, y_t: arrays aligned with `self.ids[:self.n]` (or scalars)
+        Returns (a_t, A_acc, m, kappa, dM, crossed_ids), where crossed_ids
+        are the users whose A_accumulated passed critical_area on this step.
+        """
+        n = self.n
+        x_t = np.broadcast_to(np.asarray(x_t, dtype=np.float64), (n,))
+        y_t = np.broadcast_to(np.asarray(y_t, dtype=np.float64), (n,))
+        A = self.A_accumulated[:n]
+        m = self.m[:n]
+        crit = self.critical_area[:n]
+
+        # [Physics] Micro-Area, same formula as LoveOSKernel.step
+        a_t = (self.alpha[:n] * np.abs(y_t) + self.beta[:n] * np.abs(x_t * y_t)) * self.dt[:n]
+
+        was_below = A <= crit
+        A += a_t
+        above = A > crit
+        crossed_ids = self.ids[:n][was_below & above].copy()
+
+        # [Phase Transition] m slips toward 1 above threshold, resets below
+        np.copyto(m, np.where(above, m + self.transition_speed[:n] * (1.0 - m), 0.0))
+
+        # [Economics] Dynamic Exchange Rate
+        kappa = self.base_kappa[:n] + (self.awakened_kappa[:n] - self.base_kappa[:n]) * m
+        dM_t = kappa * a_t
+
+        self.t[:n] += 1
+        return a_t, A.copy(), m.copy(), kappa, dM_t, crossed_ids
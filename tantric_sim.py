@@ -4,7 +4,7 @@ Tantric Engineering Simulator (Love-OS / HVS Protocol v2.0)
 - Simulates the nonlinear dynamics of integration, gap charging, and phase transitions.
 - Includes biological saturation limits (tanh) and irreversible OS updates (R_int decay).
 
-Tested with: Python 3.10+, numpy, pandas, matplotlib
+Tested with: Python 3.10+, numpy, pandas, matplotlib, scipy
 """
 
 from dataclasses import dataclass
@@ -12,6 +12,8 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from adaptive_integrator import GapChargeODE, noise_response, solve_adaptive
+
 # ========== 1. Parameter Definitions ==========
 
 @dataclass
@@ -50,10 +52,23 @@ def prediction_error(t: float) -> float:
     val = sum(h * np.exp(-0.5 * ((t - c) / w)**2) for c, w, h in bumps)
     return val
 
+STIMULUS_EDGES = (10, 40, 60, 90)  # Discontinuities of stimulus_schedule
+SYNC_TRIGGERS = (45, 90)           # Sync windows
+SYNC_WIDTH = 3.0
+
 def sync_event(t: float) -> float:
-    triggers = [45, 90] # Sync windows
-    width = 3.0
-    return 1.0 if any(abs(t - c) <= width/2 for c in triggers) else 0.0
+    return 1.0 if any(abs(t - c) <= SYNC_WIDTH/2 for c in SYNC_TRIGGERS) else 0.0
+
+def stimulus_values(t: np.ndarray) -> np.ndarray:
+    """stimulus_schedule on an array of times."""
+    t = np.asarray(t, dtype=float)
+    base = np.select([(10 <= t) & (t < 40), (40 <= t) & (t < 60), (60 <= t) & (t < 90)], [1.0, -0.5, 0.5], 0.0)
+    return base + 0.2 * np.sin(2 * np.pi * 0.03 * t)
+
+def sync_values(t: np.ndarray, triggers=SYNC_TRIGGERS, width: float = SYNC_WIDTH) -> np.ndarray:
+    """sync_event on an array of times (for any trigger list)."""
+    return (np.abs(np.subtract.outer(np.asarray(t, dtype=float), np.asarray(triggers, dtype=float)))
+            <= width/2).any(axis=-1).astype(float)
 
 def calculate_transient_R_int(t: float, current_base: float) -> float:
     # Transient ego rebounds over time, but bounded by the current structural base
@@ -97,7 +112,7 @@ def simulate(params: TantricParams, T: float = 120.0, dt: float = 0.1, seed: int
             -params.alpha * E
             + params.beta * S
             + params.gamma * pe
-            - params.delta * Rint
+            - params.delta * R_int
             + params.eta * noise
             + params.kappa * (V_gap if sync > 0.5 else 0) # V_gap energy flows into E only during Sync
         )
@@ -117,7 +132,161 @@ def simulate(params: TantricParams, T: float = 120.0, dt: float = 0.1, seed: int
 
     return pd.DataFrame(records)
 
-# ========== 4. Visualization & Export ==========
+# ========== 4. Ensemble Simulator (vectorized lanes) ==========
+
+def ensemble_step(params: TantricParams, t: float, dt: float, state: dict, noise: np.ndarray,
+                  drive: dict = None):
+    """
+    One step of `simulate` for every lane of `state` (updated in place).
+    state: {"E", "V_gap", "R_int_base"} arrays of shape (n_runs,)
+    drive: optional {"S", "pe", "sync"} per-lane arrays replacing stimulus_schedule,
+           prediction_error and sync_event at time t (what-if branches, see what_if.py)
+    Returns (R_int, sync) for recording.
+    """
+    E, V_gap, R_base = state["E"], state["V_gap"], state["R_int_base"]
+    if drive is None:
+        # Time-only terms as Python floats so float32 lanes stay float32
+        S = float(stimulus_schedule(t))
+        pe = float(prediction_error(t))
+        sync = float(sync_event(t))
+    else:
+        S, pe, sync = drive["S"], drive["pe"], drive["sync"]
+
+    R_int = R_base + float(calculate_transient_R_int(t, current_base=0.0))
+
+    on = sync > 0.5
+    if np.any(on):
+        upgrade = on & (V_gap > params.sync_threshold)
+        R_base[upgrade] = np.maximum(params.R_int_min, R_base[upgrade] * params.phase_transition_decay)
+
+    dVgap = params.rho * (params.V_source - V_gap) - params.chi * sync
+    np.maximum(0.0, V_gap + dVgap * dt, out=V_gap)
+
+    dE = (
+        -params.alpha * E
+        + params.beta * S
+        + params.gamma * pe
+        - params.delta * R_int
+        + params.eta * noise
+        + np.where(on, params.kappa * V_gap, 0.0)
+    )
+    E[...] = params.E_max * np.tanh((E + dE * dt) / params.E_max)
+    return R_int, sync
+
+def init_ensemble_state(params: TantricParams, n_runs: int, dtype=np.float64) -> dict:
+    return {
+        "E": np.zeros(n_runs, dtype=dtype),
+        "V_gap": np.zeros(n_runs, dtype=dtype),
+        "R_int_base": np.full(n_runs, params.R_int_base_init, dtype=dtype),
+    }
+
+def simulate_ensemble(params: TantricParams, n_runs: int, T: float = 120.0, dt: float = 0.1,
+                      seed: int = 42, dtype=np.float64, out: dict = None):
+    """
+    `simulate` for n_runs independent noise lanes at once.
+    Returns a dict: "t", "Sync" of shape (steps,) and "E", "V_gap",
+    "R_int_structural", "R_int_actual" of shape (steps, n_runs) in `dtype`.
+
+    dtype=np.float32 halves state and trajectory memory. Noise is still drawn
+    in float64 (same stream as the float64 run) and cast per step, so the two
+    precisions are directly comparable lane by lane. With n_runs=1 the lane
+    reproduces `simulate(params, T, dt, seed)`.
+    out: optional preallocated (steps, n_runs) arrays for the four trajectories
+    (e.g. views into shared memory); they are filled in place.
+    Accuracy (float32 vs float64, default params, T=120, dt=0.1, 10^4 lanes):
+    max |dE| ~ 1.5e-6, max |dV_gap| ~ 1.2e-6, max |dR_int| ~ 1e-7. OS updates
+    (V_gap vs sync_threshold) can only disagree for lanes whose V_gap is within
+    ~1e-6 of the threshold at a sync step; such a lane then diverges by one
+    phase_transition_decay factor.
+    """
+    rng = np.random.default_rng(seed)
+    steps = int(T / dt) + 1
+    state = init_ensemble_state(params, n_runs, dtype)
+
+    t_axis = np.arange(steps) * dt
+    out = dict(out) if out is not None else {}
+    for name in ("E", "V_gap", "R_int_structural", "R_int_actual"):
+        out.setdefault(name, np.empty((steps, n_runs), dtype=dtype))
+    sync_log = np.empty(steps)
+
+    for i in range(steps):
+        noise = rng.normal(0.0, 1.0, n_runs).astype(dtype, copy=False)
+        R_int, sync_log[i] = ensemble_step(params, t_axis[i], dt, state, noise)
+        out["E"][i] = state["E"]
+        out["V_gap"][i] = state["V_gap"]
+        out["R_int_structural"][i] = state["R_int_base"]
+        out["R_int_actual"][i] = R_int
+
+    out["t"] = t_axis
+    out["Sync"] = sync_log
+    return out
+
+# ========== 5. Adaptive Simulator (RK45 + events) ==========
+
+def simulate_adaptive(params: TantricParams, T: float = 120.0, dt: float = 0.1, seed: int = 42,
+                      rtol: float = 1e-6, atol: float = 1e-9, match_euler: bool = True):
+    """
+    Error-controlled counterpart of `simulate` on the same output grid t = i*dt.
+    Sync-window edges and stimulus switches are breakpoints; V_gap = 0 and
+    V_gap = sync_threshold (inside a window) are located as events. Between them
+    RK45 steps grow freely: the deterministic part is integrated adaptively and
+    the noise (same per-step samples as `simulate`, held constant over each step)
+    is added by adaptive_integrator.noise_response, so eta > 0 does not force a
+    breakpoint per step.
+
+    match_euler=True (default) reproduces what the Euler loop does at this dt:
+    the per-step tanh shrink and the per-step OS update (one decay factor per
+    step while the window is open and V_gap > sync_threshold) become rates, and
+    row i is the state after the step taken at t_i, as in `simulate`. What
+    remains is Euler's own truncation error: default run, ~300 RK45 steps,
+    max |dE| ~ 3e-2, final R_int_structural 0.346 vs 0.324 (with decay 0.6 per
+    step, a fraction of a step above the threshold shows up in R_int).
+    match_euler=False integrates the dt-independent model instead (smooth
+    saturation, one OS update per sync window). Its results differ from
+    `simulate` by design: R_int_base drops once per window instead of
+    ~SYNC_WIDTH/dt times, and E differs by O(1) near saturation.
+    Cost: at dt=0.1 this buys accuracy control, not speed. The default run takes
+    ~2200 RHS evaluations (~0.06 s) against 1201 Euler steps (~0.01 s for
+    `simulate`); the noise response and output columns are array ops. The
+    adaptive path pays off on long smooth runs, e.g. BioTransformerCore.run_adaptive
+    (60000 Euler updates ~0.3 s vs 172 RK45 steps ~0.045 s).
+    Solver statistics are returned in df.attrs["solver"].
+    """
+    rng = np.random.default_rng(seed)
+    steps = int(T / dt) + 1
+    t_axis = np.arange(steps) * dt
+    noise = rng.normal(0.0, 1.0, steps)
+    grid = np.arange(steps + 1) * dt  # noise[i] drives [grid[i], grid[i+1])
+
+    edges = [c + side * SYNC_WIDTH / 2 for c in SYNC_TRIGGERS for side in (-1, 1)]
+    breakpoints = list(STIMULUS_EDGES) + edges
+
+    model = GapChargeODE(
+        params, stimulus_schedule, prediction_error, sync_event,
+        rebound=lambda t: calculate_transient_R_int(t, current_base=0.0),
+        euler_dt=dt if match_euler else None,
+    )
+    Y, stats = solve_adaptive(model, [0.0, 0.0, params.R_int_base_init], grid,
+                              breakpoints, rtol=rtol, atol=atol)
+    if params.eta != 0:
+        schedule = {"S": stimulus_values(t_axis), "pe": prediction_error(t_axis),
+                    "rebound": calculate_transient_R_int(t_axis, 0.0), "sync": sync_values(t_axis + 0.5 * dt)}
+        Y[:, 0] += noise_response(model, grid, Y, noise, params.eta, schedule)
+    # Euler records the state after the step taken at t_i
+    Y = Y[1:] if match_euler else Y[:-1]
+
+    df = pd.DataFrame({
+        "t": t_axis,
+        "E": Y[:, 0],
+        "V_gap": Y[:, 1],
+        "R_int_structural": Y[:, 2],
+        "R_int_actual": Y[:, 2] + calculate_transient_R_int(t_axis, 0.0),
+        "Sync": sync_values(t_axis),
+    })
+    df.attrs["solver"] = stats
+    return df
+
+# ========== 6. Visualization & Export ==========
 
 def plot_results(df: pd.DataFrame):
     plt.figure(figsize=(10, 8))
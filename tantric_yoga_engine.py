@@ -1,6 +1,3 @@
-This is the Python code ready for the repository. It includes the logic for the simulation we discussed.
-
-```python
 # tantric_yoga_engine.py
 # Tantric Yoga Engineering (TYE) - Bio-Energy Simulation
 #
@@ -45,6 +42,10 @@ def get_alignment_factor(phase_diff_rad: float) -> float:
     """
     return float(np.cos(np.clip(phase_diff_rad, 0, np.pi)))
 
+def get_alignment_factors(phase_diff_deg: np.ndarray) -> np.ndarray:
+    """Vectorized get_alignment_factor for phase differences given in degrees."""
+    return np.cos(np.clip(np.deg2rad(phase_diff_deg), 0, np.pi))
+
 def get_selection_gate(compatibility: float) -> float:
     """
     S(c): Logistic gate. 
@@ -53,100 +54,143 @@ def get_selection_gate(compatibility: float) -> float:
     # Sigmoid function centered at 0.6
     return 1.0 / (1.0 + np.exp(-12.0 * (compatibility - 0.6)))
 
-def run_simulation():
-    # Define Scenarios
-    scenarios = [
-        {
-            "name": "A. Twin Dynamic (Runner -> Union)", 
-            "compat": 0.95, 
-            "phase_schedule": "converge" # Start opposed, end aligned
-        },
-        {
-            "name": "B. Low Compatibility (No Spark)", 
-            "compat": 0.3, 
-            "phase_schedule": "neutral"  # Stays orthogonal
-        }
-    ]
-    
-    # Time vector
+# Define Scenarios
+SCENARIOS = [
+    {
+        "name": "A. Twin Dynamic (Runner -> Union)", 
+        "compat": 0.95, 
+        "phase_schedule": "converge" # Start opposed, end aligned
+    },
+    {
+        "name": "B. Low Compatibility (No Spark)", 
+        "compat": 0.3, 
+        "phase_schedule": "neutral"  # Stays orthogonal
+    }
+]
+
+def phase_schedule_deg(name: str, t: np.ndarray) -> np.ndarray:
+    """Phase difference [deg] over the time axis for a named schedule."""
+    if name == "converge":
+        # Start at 140deg (Repulsion) -> Smoothly transition to 0deg (Union)
+        start_deg = 140
+        progress = np.clip((t - 40) / 50, 0.0, 1.0)  # Transition phase (Surrender): 40..90
+        return start_deg * (1 - progress)
+    return np.full_like(t, 90.0)  # Neutral/Indifferent
+
+TRACES = ("I1", "I2", "M", "Align")
+
+def simulate_lanes(cfg: TYEConfig, compat, phase_deg, breath_period=None, phase_offset=np.pi/6,
+                   record=()):
+    """
+    Advance many scenarios ("lanes") of the coupled RLC pair in parallel.
+    compat:        (n,) compatibility per lane (selection gate computed once per lane)
+    phase_deg:     phase difference in degrees, broadcastable to (N, n):
+                   scalar or (1, n) / (n,) constant in time (the (n,) form only when
+                   n != N), (N,) / (N, 1) shared by all lanes, or (N, n) per lane
+    breath_period: scalar or (n,) (default cfg.breath_period)
+    phase_offset:  scalar or (n,) breath phase shift of person 2 [rad]
+    record:        names from TRACES to keep as (N, n) arrays. The default () keeps
+                   only the per-lane summaries, which is what screening wants
+                   (4 traces of 6001 x 10000 lanes would be ~1.9 GB).
+    Returns {"t", "R"} (N,), recorded traces, and per-lane "I1_final", "I2_final",
+    "I1_peak", "I2_peak" (max |I|).
+    """
     N = int(cfg.T / cfg.dt) + 1
     t = np.linspace(0, cfg.T, N)
-    
-    results = {}
+    compat = np.atleast_1d(np.asarray(compat, dtype=float))
+    n = len(compat)
+    period = cfg.breath_period if breath_period is None else breath_period
+    shared_breath = np.ndim(period) == 0 and np.ndim(phase_offset) == 0
 
-    for sc in scenarios:
-        # State Variables: Charge (q) and Current (I) for two bodies
-        q1, I1, q2, I2 = 0.0, 0.0, 0.0, 0.0
-        
-        # Data Logs
-        log_I1, log_I2 = np.zeros(N), np.zeros(N)
-        log_M, log_Align = np.zeros(N), np.zeros(N)
-        log_R = np.zeros(N)
+    # Time-only terms, once for the shared axis
+    R_curr = cfg.R_end + (cfg.R_start - cfg.R_end) * np.exp(-t / cfg.tau_R)
+    if shared_breath:
+        V1_t = cfg.V_base + cfg.breath_amp * np.sin(2 * np.pi * t / period)
+        V2_t = cfg.V_base + cfg.breath_amp * np.sin(2 * np.pi * t / period + phase_offset)
+    else:
+        period = np.broadcast_to(np.asarray(period, dtype=float), (n,))
+        phase_offset = np.broadcast_to(np.asarray(phase_offset, dtype=float), (n,))
 
-        for i in range(N):
-            ti = t[i]
-            
-            # 1. Hardware State: Resistance drops due to Yoga/Practice
-            R_curr = cfg.R_end + (cfg.R_start - cfg.R_end) * np.exp(-ti / cfg.tau_R)
-            
-            # 2. Input: Voltage driven by Breath (Prana)
-            V1 = cfg.V_base + cfg.breath_amp * np.sin(2 * np.pi * ti / cfg.breath_period)
-            # Person 2 breathes with a slight phase shift
-            V2 = cfg.V_base + cfg.breath_amp * np.sin(2 * np.pi * ti / cfg.breath_period + np.pi/6)
-            
-            # 3. Control Logic: Phase Alignment (The "Runner" Logic)
-            if sc["phase_schedule"] == "converge":
-                # Start at 140deg (Repulsion) -> Smoothly transition to 0deg (Union)
-                start_deg = 140
-                if ti < 40: 
-                    deg = start_deg
-                elif ti < 90:
-                    # Transition phase (Surrender)
-                    progress = (ti - 40) / 50
-                    deg = start_deg * (1 - progress)
-                else:
-                    deg = 0
-                d_theta = np.deg2rad(deg)
-            else:
-                d_theta = np.deg2rad(90) # Neutral/Indifferent
-            
-            # 4. Calculate Coupling Force (Mutual Inductance M)
-            align = get_alignment_factor(d_theta)
-            select = get_selection_gate(sc["compat"])
-            
-            # M = k * S * A * sqrt(L1*L2)
-            M = cfg.coupling_k * np.sqrt(cfg.L1 * cfg.L2) * align * select
-            
-            # 5. Solve Circuit ODE (Coupled RLC)
-            # L1*dI1/dt + R1*I1 + q1/C1 + M*dI2/dt = V1
-            det = cfg.L1 * cfg.L2 - M**2
-            if det < 1e-6: det = 1e-6 # Avoid singularity
-            
-            rhs1 = V1 - R_curr * I1 - q1 / cfg.C1
-            rhs2 = V2 - R_curr * I2 - q2 / cfg.C2
-            
-            dI1 = (cfg.L2 * rhs1 - M * rhs2) / det
-            dI2 = (-M * rhs1 + cfg.L1 * rhs2) / det
-            
-            # Update State (Euler integration for simplicity)
-            q1 += I1 * cfg.dt
-            q2 += I2 * cfg.dt
-            I1 += dI1 * cfg.dt
-            I2 += dI2 * cfg.dt
-            
-            # Log
-            log_I1[i] = I1
-            log_I2[i] = I2
-            log_M[i] = M
-            log_Align[i] = align
-            log_R[i] = R_curr
-
-        results[sc["name"]] = {
-            "t": t, "I1": log_I1, "I2": log_I2, 
-            "M": log_M, "Align": log_Align, "R": log_R
-        }
-
-    plot_results(results)
+    # Per-lane constants and the coupling schedule
+    select = get_selection_gate(compat)
+    phase_deg = np.asarray(phase_deg, dtype=float)
+    if phase_deg.ndim == 0:
+        phase_deg = phase_deg.reshape(1, 1)
+    elif phase_deg.ndim == 1:
+        phase_deg = phase_deg.reshape(N, 1) if len(phase_deg) == N else phase_deg.reshape(1, -1)
+    np.broadcast_shapes(phase_deg.shape, (N, n))  # ValueError on a mismatched schedule
+    Mk = cfg.coupling_k * np.sqrt(cfg.L1 * cfg.L2)
+    if phase_deg.shape[0] == 1:
+        # Time-invariant phase: alignment and M are per-lane constants
+        align_c = get_alignment_factors(phase_deg[0])
+        M_c = Mk * align_c * select
+    elif phase_deg.shape[1] == 1:
+        # Shared schedule: alignment is a time-only term
+        align_t = get_alignment_factors(phase_deg[:, 0])
+
+    unknown = set(record) - set(TRACES)
+    if unknown:
+        raise ValueError(f"unknown traces {sorted(unknown)}; choose from {TRACES}")
+    q1, I1, q2, I2 = (np.zeros(n) for _ in range(4))
+    logs = {name: np.zeros((N, n)) for name in record}
+    I1_peak, I2_peak = np.zeros(n), np.zeros(n)
+
+    for i in range(N):
+        if shared_breath:
+            V1, V2 = V1_t[i], V2_t[i]
+        else:
+            V1 = cfg.V_base + cfg.breath_amp * np.sin(2 * np.pi * t[i] / period)
+            V2 = cfg.V_base + cfg.breath_amp * np.sin(2 * np.pi * t[i] / period + phase_offset)
+
+        # M = k * S * A * sqrt(L1*L2)
+        if phase_deg.shape[0] == 1:
+            align, M = align_c, M_c
+        else:
+            align = align_t[i] if phase_deg.shape[1] == 1 else get_alignment_factors(phase_deg[i])
+            M = Mk * align * select
+
+        # Coupled RLC: L1*dI1/dt + R*I1 + q1/C1 + M*dI2/dt = V1
+        det = np.maximum(cfg.L1 * cfg.L2 - M**2, 1e-6)  # Avoid singularity
+        rhs1 = V1 - R_curr[i] * I1 - q1 / cfg.C1
+        rhs2 = V2 - R_curr[i] * I2 - q2 / cfg.C2
+        dI1 = (cfg.L2 * rhs1 - M * rhs2) / det
+        dI2 = (-M * rhs1 + cfg.L1 * rhs2) / det
+
+        # Update State (Euler integration for simplicity)
+        q1 += I1 * cfg.dt
+        q2 += I2 * cfg.dt
+        I1 += dI1 * cfg.dt
+        I2 += dI2 * cfg.dt
+
+        np.maximum(I1_peak, np.abs(I1), out=I1_peak)
+        np.maximum(I2_peak, np.abs(I2), out=I2_peak)
+        for name, val in (("I1", I1), ("I2", I2), ("M", M), ("Align", align)):
+            if name in logs:
+                logs[name][i] = val
+
+    out = {"t": t, "R": R_curr, "I1_final": I1.copy(), "I2_final": I2.copy(),
+           "I1_peak": I1_peak, "I2_peak": I2_peak}
+    out.update(logs)
+    return out
+
+def simulate_scenarios(cfg: TYEConfig = cfg, scenarios=SCENARIOS):
+    """
+    Integrate the coupled RLC pair for every scenario (as lanes of one run).
+    Returns {scenario name: {"t", "I1", "I2", "M", "Align", "R"}}.
+    """
+    N = int(cfg.T / cfg.dt) + 1
+    t = np.linspace(0, cfg.T, N)
+    phase = np.stack([phase_schedule_deg(sc["phase_schedule"], t) for sc in scenarios], axis=1)
+    lanes = simulate_lanes(cfg, [sc["compat"] for sc in scenarios], phase, record=TRACES)
+
+    return {
+        sc["name"]: {"t": t, "I1": lanes["I1"][:, j], "I2": lanes["I2"][:, j],
+                     "M": lanes["M"][:, j], "Align": lanes["Align"][:, j], "R": lanes["R"]}
+        for j, sc in enumerate(scenarios)
+    }
+
+def run_simulation():
+    plot_results(simulate_scenarios(cfg))
 
 def plot_results(results):
     plt.style.use('dark_background')
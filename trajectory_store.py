@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Indexed Trajectory Store (ensemble outputs of simulate / simulate_hvs)
+- Each write is a shard: run-major .npy columns (one row per run), reloaded
+  memory-mapped, so reading a run touches only that run's rows.
+- At write time every run is indexed:
+    * OS updates: time and sync window of each structural R_int drop
+    * Sync windows: peak V_gap seen during each window
+    * Extrema: peak/trough of E (and their times), peak V_gap, final values
+- Queries run on the small in-memory index; trajectories are loaded only for
+  the matching runs.
+- Several writer processes may share one root: shard numbers (which fix the
+  run ids) are taken under a lock file, after picking up shards written by
+  others. Without fcntl (Windows) a root must have a single writer.
+
+Usage:
+    store = TrajectoryStore("sweep_store")
+    store.add_tantric(simulate_ensemble(p, 10_000), p)
+    store.add_hvs(simulate_hvs_batch(presets), presets)
+    ids = store.runs_with_os_update(window=1)          # second sync window
+    ids = store.runs_with_sync_above(p.sync_threshold)  # V_gap > threshold at a sync
+    ids = store.runs_saturated(frac=0.95)               # E_peak >= 0.95 * E_max
+    E = store.load(ids, "E")                            # (len(ids), steps)
+
+Tested with: Python 3.10+, numpy
+"""
+
+import json
+import os
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, one writer per root
+    fcntl = None
+
+COLUMNS = ("E", "V_gap", "R_int", "Sync")
+SUMMARY = ("E_peak", "E_peak_t", "E_trough", "E_trough_t", "E_final",
+           "V_gap_peak", "R_int_final", "n_os_updates", "E_max", "sync_threshold")
+
+# ========== 1. Indexing (write time) ==========
+
+def _window_labels(sync: np.ndarray) -> np.ndarray:
+    """Per-run sync window number (0, 1, ...) at each step, -1 outside windows."""
+    on = sync > 0.5
+    rising = on & ~np.vstack([np.zeros((1, on.shape[1]), dtype=bool), on[:-1]])
+    return np.where(on, np.cumsum(rising, axis=0) - 1, -1)
+
+def index_runs(t, E, V_gap, R_int, sync, E_max, sync_threshold):
+    """
+    Summary and event tables for (steps, n) trajectories.
+    Returns (summary dict of (n,) arrays, os_events, sync_windows) where
+    os_events = {"run", "t", "window"} and sync_windows = {"run", "window", "t_start", "V_gap_peak"}
+    with "run" the lane index within this batch.
+    """
+    n = E.shape[1]
+    labels = _window_labels(sync)
+
+    peak_i, trough_i = E.argmax(axis=0), E.argmin(axis=0)
+    lanes = np.arange(n)
+    drops = np.vstack([np.zeros((1, n), dtype=bool), R_int[1:] < R_int[:-1]])
+    summary = {
+        "E_peak": E[peak_i, lanes], "E_peak_t": t[peak_i],
+        "E_trough": E[trough_i, lanes], "E_trough_t": t[trough_i],
+        "E_final": E[-1], "V_gap_peak": V_gap.max(axis=0), "R_int_final": R_int[-1],
+        "n_os_updates": drops.sum(axis=0),
+        "E_max": np.broadcast_to(np.asarray(E_max, dtype=float), (n,)),
+        "sync_threshold": np.broadcast_to(np.asarray(sync_threshold, dtype=float), (n,)),
+    }
+
+    step_i, run_i = np.nonzero(drops)
+    os_events = {"run": run_i, "t": t[step_i], "window": labels[step_i, run_i]}
+
+    n_win = int(labels.max()) + 1 if labels.size else 0
+    win_run, win_k, win_t, win_peak = [], [], [], []
+    for k in range(n_win):
+        in_k = labels == k
+        has = in_k.any(axis=0)
+        if not has.any():
+            continue
+        peak = np.where(in_k, V_gap, -np.inf).max(axis=0)
+        start = t[in_k.argmax(axis=0)]
+        win_run.append(lanes[has]); win_k.append(np.full(has.sum(), k))
+        win_t.append(start[has]); win_peak.append(peak[has])
+    cat = lambda parts, dtype: np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+    sync_windows = {"run": cat(win_run, np.int64), "window": cat(win_k, np.int64),
+                    "t_start": cat(win_t, float), "V_gap_peak": cat(win_peak, float)}
+    return summary, os_events, sync_windows
+
+# ========== 2. Store ==========
+
+class TrajectoryStore:
+    def __init__(self, root: str):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        os.makedirs(self.root, exist_ok=True)
+        self._shards = []   # shard directory names, in run-id order
+        self._offsets = []  # first global run id of each shard
+        self._steps = []    # time steps per run in each shard
+        self.n_runs = 0
+        self.index = {name: np.empty(0) for name in SUMMARY}
+        self.os_events = {"run": np.empty(0, np.int64), "t": np.empty(0), "window": np.empty(0, np.int64)}
+        self.sync_windows = {"run": np.empty(0, np.int64), "window": np.empty(0, np.int64),
+                             "t_start": np.empty(0), "V_gap_peak": np.empty(0)}
+        self._mmaps = {}
+        self._load_existing()
+
+    # --- writing ---
+    def add(self, t, E, V_gap, R_int, sync, E_max, sync_threshold, meta=None):
+        """Store (steps, n) trajectories; returns the global run ids."""
+        steps, n = E.shape
+        sync = np.broadcast_to(np.asarray(sync).reshape(steps, -1), (steps, n))
+        summary, os_events, sync_windows = index_runs(
+            np.asarray(t), E, V_gap, R_int, sync, E_max, sync_threshold)
+
+        tmp = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "t.npy"), np.asarray(t, dtype=float))
+        for col, arr in zip(COLUMNS, (E, V_gap, R_int, sync)):
+            np.save(os.path.join(tmp, f"{col}.npy"), np.ascontiguousarray(np.asarray(arr).T))
+        for prefix, table in (("summary", summary), ("os", os_events), ("win", sync_windows)):
+            for key, arr in table.items():
+                np.save(os.path.join(tmp, f"{prefix}.{key}.npy"), np.asarray(arr))
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump({"n_runs": n, "steps": steps, "meta": meta or {}}, fh, default=repr)
+        with self._lock():
+            self._load_existing()  # shards of other writers come first
+            name = f"shard-{len(self._shards):05d}-{uuid.uuid4().hex[:8]}"
+            os.rename(tmp, os.path.join(self.root, name))  # shard becomes visible atomically
+            first = self.n_runs
+            self._register(name, n, steps, summary, os_events, sync_windows)
+        return np.arange(first, first + n)
+
+    def add_tantric(self, result: dict, params, meta=None):
+        """Store a tantric_sim.simulate_ensemble result."""
+        return self.add(result["t"], result["E"], result["V_gap"], result["R_int_structural"],
+                        result["Sync"], params.E_max, params.sync_threshold,
+                        meta={"engine": "tantric_sim", "params": repr(params), **(meta or {})})
+
+    def add_hvs(self, result: dict, params_list, meta=None):
+        """Store a simulate_hvs_batch result (E_max 10, upgrade threshold 3.0 as in simulate_hvs)."""
+        return self.add(result["t"], result["E"], result["V_gap"], result["R_int"],
+                        result["Sync"], 10.0, 3.0,
+                        meta={"engine": "simulate_hvs", "params": [repr(p) for p in params_list],
+                              **(meta or {})})
+
+    def _register(self, name, n, steps, summary, os_events, sync_windows):
+        first = self.n_runs
+        self._shards.append(name)
+        self._offsets.append(first)
+        self._steps.append(steps)
+        self.n_runs += n
+        for key in SUMMARY:
+            self.index[key] = np.concatenate([self.index[key], summary[key]])
+        for table, new in ((self.os_events, os_events), (self.sync_windows, sync_windows)):
+            for key in table:
+                vals = np.asarray(new[key])
+                table[key] = np.concatenate([table[key], vals + first if key == "run" else vals])
+
+    @contextmanager
+    def _lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.root, ".lock"), "a+") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _load_existing(self):
+        """Register shards not seen yet, in shard-number order."""
+        known = set(self._shards)
+        names = sorted((d for d in os.listdir(self.root) if d.startswith("shard-") and d not in known),
+                       key=lambda d: int(d.split("-")[1]))
+        for name in names:
+            path = os.path.join(self.root, name)
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            load = lambda f: np.load(os.path.join(path, f))
+            summary = {k: load(f"summary.{k}.npy") for k in SUMMARY}
+            os_events = {k: load(f"os.{k}.npy") for k in self.os_events}
+            sync_windows = {k: load(f"win.{k}.npy") for k in self.sync_windows}
+            self._register(name, meta["n_runs"], meta["steps"], summary, os_events, sync_windows)
+
+    # --- queries (index only) ---
+    def runs_with_os_update(self, window=None, t_range=None) -> np.ndarray:
+        """Runs with an OS update, optionally in sync window `window` (0-based) or time range."""
+        ev = self.os_events
+        mask = np.ones(len(ev["run"]), dtype=bool)
+        if window is not None:
+            mask &= ev["window"] == window
+        if t_range is not None:
+            mask &= (ev["t"] >= t_range[0]) & (ev["t"] <= t_range[1])
+        return np.unique(ev["run"][mask])
+
+    def runs_with_sync_above(self, threshold=None, window=None) -> np.ndarray:
+        """Runs whose V_gap exceeded `threshold` (default: each run's sync_threshold) during a sync."""
+        w = self.sync_windows
+        limit = self.index["sync_threshold"][w["run"]] if threshold is None else threshold
+        mask = w["V_gap_peak"] > limit
+        if window is not None:
+            mask &= w["window"] == window
+        return np.unique(w["run"][mask])
+
+    def runs_saturated(self, frac=0.95) -> np.ndarray:
+        """Runs where E came within `frac` of the saturation limit E_max (either sign)."""
+        lim = frac * self.index["E_max"]
+        return np.nonzero((self.index["E_peak"] >= lim) | (self.index["E_trough"] <= -lim))[0]
+
+    def runs_where(self, **ranges) -> np.ndarray:
+        """Summary range filter, e.g. runs_where(R_int_final=(None, 0.2), n_os_updates=(1, None))."""
+        mask = np.ones(self.n_runs, dtype=bool)
+        for key, (lo, hi) in ranges.items():
+            col = self.index[key]
+            if lo is not None:
+                mask &= col >= lo
+            if hi is not None:
+                mask &= col <= hi
+        return np.nonzero(mask)[0]
+
+    # --- trajectory access (memory-mapped) ---
+    def _column(self, shard_no, column):
+        key = (shard_no, column)
+        if key not in self._mmaps:
+            path = os.path.join(self.root, self._shards[shard_no], f"{column}.npy")
+            self._mmaps[key] = np.load(path, mmap_mode="r")
+        return self._mmaps[key]
+
+    def time_axis(self, run_id) -> np.ndarray:
+        shard_no = int(np.searchsorted(self._offsets, run_id, side="right") - 1)
+        return self._column(shard_no, "t")
+
+    def load(self, run_ids, column="E") -> np.ndarray:
+        """
+        (len(run_ids), steps) trajectories in the order of run_ids; only the
+        requested rows are read. All runs must share one step count (e.g. do not
+        mix add_tantric and add_hvs shards with different T), else ValueError.
+        An empty selection has shape (0, steps), or (0, 0) if the store mixes
+        step counts.
+        """
+        run_ids = np.asarray(run_ids, dtype=np.int64).reshape(-1)
+        if run_ids.size and (run_ids.min() < 0 or run_ids.max() >= self.n_runs):
+            raise IndexError(f"run ids must be in [0, {self.n_runs})")
+        shard_of = np.searchsorted(self._offsets, run_ids, side="right") - 1
+        shards = np.unique(shard_of)
+        if not run_ids.size:
+            n_steps = self._steps[0] if len(set(self._steps)) == 1 else 0
+            return np.empty((0, n_steps))
+        steps = {self._steps[s] for s in shards}
+        if len(steps) > 1:
+            raise ValueError(f"runs have different step counts {sorted(steps)}; "
+                             "load each group separately (see time_axis)")
+        n_steps = steps.pop()
+        out = np.empty((run_ids.size, n_steps), dtype=self._column(int(shards[0]), column).dtype)
+        for s in shards:
+            pos = np.nonzero(shard_of == s)[0]
+            out[pos] = self._column(int(s), column)[run_ids[pos] - self._offsets[s]]
+        return out
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+What-If Branching (shared prefix, forked continuations)
+- Runs the part of a simulation every variant shares once, up to the divergence
+  time t_fork, and snapshots the lane state (E, V_gap, R_int_base) and the
+  noise RNG.
+- `fork_tantric` / `fork_hvs` continue all variants from that snapshot in one
+  vectorized batch (variant-major lanes), so a sweep of V variants costs one
+  prefix plus V suffixes instead of V full runs.
+- A Variant changes the future only: stimulus / prediction-error schedules,
+  sync windows (e.g. move the second window of sync_event or SYNC_TIMES), or the
+  run_ab_test arm (sync on/off). It must agree with the base run before t_fork.
+- Every branch reuses the prefix's noise stream, so it equals a from-scratch
+  run of the variant with the same seed (common random numbers across branches).
+
+Usage:
+    snap = tantric_prefix(TantricParams(), t_fork=60.0, n_runs=100)
+    calm = lambda t: 0.0 if t >= 60 else stimulus_schedule(t)
+    out = fork_tantric(snap, [Variant("base"), Variant("calm", stimulus=calm)])
+    out["E"]                                    # (steps, n_variants, n_runs)
+
+    snap = hvs_prefix([PRESETS["Buddhist"]], t_fork=50.0)
+    out = fork_hvs(snap, [Variant("sync"), Variant("passive", enable_sync=False)])
+
+Tested with: Python 3.10+, numpy
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from tantric_sim import (SYNC_TRIGGERS, SYNC_WIDTH, TantricParams, ensemble_step, init_ensemble_state,
+                         prediction_error, stimulus_schedule)
+from hvs_engine import (SYNC_TIMES, hvs_init_state, hvs_prediction_error, hvs_step, hvs_stimulus,
+                        stack_hvs_params)
+
+TANTRIC_COLUMNS = ("E", "V_gap", "R_int_structural", "R_int_actual", "Sync")
+HVS_COLUMNS = ("E", "V_gap", "R_int", "Sync")
+
+@dataclass
+class Variant:
+    name: str = "base"
+    stimulus: Optional[Callable] = None          # t -> S (default: the engine's schedule)
+    prediction_error: Optional[Callable] = None  # t -> pe
+    sync_triggers: Optional[tuple] = None        # replaces SYNC_TRIGGERS / SYNC_TIMES
+    enable_sync: Optional[bool] = None           # HVS arm after t_fork (default: prefix arm)
+
+@dataclass
+class Snapshot:
+    engine: str               # "tantric" or "hvs"
+    i_fork: int               # first step owned by the variants
+    t_axis: np.ndarray        # full time axis (prefix + suffix)
+    dt: float
+    state: dict               # lane state after step i_fork - 1
+    prefix: dict              # recorded rows [0, i_fork), (i_fork, n_lanes)
+    params: object            # TantricParams, or stacked HVS lanes
+    rng_state: dict = None    # tantric noise generator at the fork
+    sync_enabled: np.ndarray = None
+
+    @property
+    def t_fork(self) -> float:
+        return float(self.t_axis[self.i_fork]) if self.i_fork < len(self.t_axis) else np.inf
+
+def _fork_index(t_axis, t_fork):
+    """First grid step at or after t_fork (tolerant to float grid error)."""
+    return int(np.searchsorted(t_axis, t_fork - 1e-9, side="left"))
+
+def _per_lane(values, n_rep, dtype=float):
+    """Per-variant values -> variant-major per-lane array."""
+    return np.repeat(np.asarray(values, dtype=dtype), n_rep)
+
+# ========== 1. Tantric engine (tantric_sim.simulate) ==========
+
+def _tantric_sync(t, triggers):
+    return 1.0 if any(abs(t - c) <= SYNC_WIDTH/2 for c in triggers) else 0.0
+
+def tantric_prefix(params: TantricParams, t_fork: float, n_runs: int = 1, T: float = 120.0,
+                   dt: float = 0.1, seed: int = 42, dtype=np.float64) -> Snapshot:
+    """Run simulate_ensemble's steps before t_fork once and snapshot state + RNG."""
+    rng = np.random.default_rng(seed)
+    t_axis = np.arange(int(T / dt) + 1) * dt
+    i_fork = _fork_index(t_axis, t_fork)
+    state = init_ensemble_state(params, n_runs, dtype)
+    prefix = {name: np.empty((i_fork, n_runs), dtype=dtype) for name in TANTRIC_COLUMNS}
+    for i in range(i_fork):
+        noise = rng.normal(0.0, 1.0, n_runs).astype(dtype, copy=False)
+        R_int, sync = ensemble_step(params, t_axis[i], dt, state, noise)
+        prefix["E"][i] = state["E"]
+        prefix["V_gap"][i] = state["V_gap"]
+        prefix["R_int_structural"][i] = state["R_int_base"]
+        prefix["R_int_actual"][i] = R_int
+        prefix["Sync"][i] = sync
+    return Snapshot("tantric", i_fork, t_axis, dt, state, prefix, params,
+                    rng_state=rng.bit_generator.state)
+
+def fork_tantric(snap: Snapshot, variants) -> dict:
+    """
+    Continue every variant from `snap` in one batch.
+    Returns {"t": (steps,), column: (steps, n_variants, n_runs)} with the shared
+    prefix rows filled in; only the suffix is simulated.
+    """
+    n_var, n_runs = len(variants), snap.state["E"].shape[0]
+    dtype = snap.state["E"].dtype
+    state = {k: np.tile(v, n_var) for k, v in snap.state.items()}
+    rng = np.random.default_rng()
+    rng.bit_generator.state = snap.rng_state
+
+    S_fns = [v.stimulus or stimulus_schedule for v in variants]
+    pe_fns = [v.prediction_error or prediction_error for v in variants]
+    triggers = [SYNC_TRIGGERS if v.sync_triggers is None else v.sync_triggers for v in variants]
+
+    steps = len(snap.t_axis)
+    out = {name: np.empty((steps, n_var, n_runs), dtype=dtype) for name in TANTRIC_COLUMNS}
+    for name in TANTRIC_COLUMNS:
+        out[name][:snap.i_fork] = snap.prefix[name][:, None, :]
+    for i in range(snap.i_fork, steps):
+        t = snap.t_axis[i]
+        drive = {
+            "S": _per_lane([f(t) for f in S_fns], n_runs, dtype),
+            "pe": _per_lane([f(t) for f in pe_fns], n_runs, dtype),
+            "sync": _per_lane([_tantric_sync(t, tr) for tr in triggers], n_runs, dtype),
+        }
+        # Same draw per base lane for every variant (the prefix's stream)
+        noise = np.tile(rng.normal(0.0, 1.0, n_runs).astype(dtype, copy=False), n_var)
+        R_int, sync = ensemble_step(snap.params, t, snap.dt, state, noise, drive)
+        out["E"][i] = state["E"].reshape(n_var, n_runs)
+        out["V_gap"][i] = state["V_gap"].reshape(n_var, n_runs)
+        out["R_int_structural"][i] = state["R_int_base"].reshape(n_var, n_runs)
+        out["R_int_actual"][i] = R_int.reshape(n_var, n_runs)
+        out["Sync"][i] = sync.reshape(n_var, n_runs)
+    out["t"] = snap.t_axis
+    return out
+
+# ========== 2. HVS engine (simulate_hvs) ==========
+
+def hvs_prefix(params_list, t_fork: float, enable_sync=True, T: float = 100.0, dt: float = 0.1,
+               dtype=np.float64) -> Snapshot:
+    """Run simulate_hvs_batch's steps before t_fork once and snapshot the lane state."""
+    t_axis = np.linspace(0, T, int(T / dt) + 1)
+    i_fork = _fork_index(t_axis, t_fork)
+    lanes = stack_hvs_params(params_list, dtype)
+    n = len(params_list)
+    sync_enabled = np.broadcast_to(np.asarray(enable_sync, dtype=bool), (n,)).copy()
+    state = hvs_init_state(lanes, dtype)
+    prefix = {name: np.empty((i_fork, n), dtype=dtype) for name in HVS_COLUMNS}
+    for i in range(i_fork):
+        is_sync = hvs_step(lanes, t_axis[i], dt, state, sync_enabled)
+        prefix["E"][i] = state["E"]
+        prefix["V_gap"][i] = state["V_gap"]
+        prefix["R_int"][i] = state["R_int_base"]
+        prefix["Sync"][i] = is_sync
+    return Snapshot("hvs", i_fork, t_axis, dt, state, prefix, lanes, sync_enabled=sync_enabled)
+
+def fork_hvs(snap: Snapshot, variants) -> dict:
+    """
+    Continue every variant (x every prefix lane) from `snap` in one batch.
+    Returns {"t": (steps,), column: (steps, n_variants, n_lanes)}.
+    """
+    n_var, n = len(variants), snap.state["E"].shape[0]
+    dtype = snap.state["E"].dtype
+    state = {k: np.tile(v, n_var) for k, v in snap.state.items()}
+    lanes = {k: np.tile(v, n_var) for k, v in snap.params.items()}
+    sync_enabled = np.concatenate([
+        snap.sync_enabled if v.enable_sync is None else np.full(n, bool(v.enable_sync))
+        for v in variants])
+    half_width = lanes["pulse_width"] / 2
+
+    S_fns = [v.stimulus or hvs_stimulus for v in variants]
+    pe_fns = [v.prediction_error or hvs_prediction_error for v in variants]
+    triggers = [SYNC_TIMES if v.sync_triggers is None else v.sync_triggers for v in variants]
+
+    steps = len(snap.t_axis)
+    out = {name: np.empty((steps, n_var, n), dtype=dtype) for name in HVS_COLUMNS}
+    for name in HVS_COLUMNS:
+        out[name][:snap.i_fork] = snap.prefix[name][:, None, :]
+    for i in range(snap.i_fork, steps):
+        t = snap.t_axis[i]
+        gap = _per_lane([min(abs(t - st) for st in tr) for tr in triggers], n)
+        drive = {
+            "S": _per_lane([f(t) for f in S_fns], n, dtype),
+            "pe": _per_lane([f(t) for f in pe_fns], n, dtype),
+            "window": gap <= half_width,
+        }
+        is_sync = hvs_step(lanes, t, snap.dt, state, sync_enabled, drive)
+        out["E"][i] = state["E"].reshape(n_var, n)
+        out["V_gap"][i] = state["V_gap"].reshape(n_var, n)
+        out["R_int"][i] = state["R_int_base"].reshape(n_var, n)
+        out["Sync"][i] = is_sync.reshape(n_var, n)
+    out["t"] = snap.t_axis
+    return out
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+    from hvs_engine import PRESETS
+
+    # Tantric: move the second sync window, or calm the stimulus after t=60
+    snap = tantric_prefix(TantricParams(), t_fork=60.0, n_runs=200)
+    variants = [Variant("base")] + [Variant(f"sync@{c}", sync_triggers=(45, c)) for c in (70, 80, 100, 110)]
+    variants.append(Variant("calm", stimulus=lambda t: 0.0 if t >= 60 else stimulus_schedule(t)))
+    out = fork_tantric(snap, variants)
+
+    # HVS: switch the run_ab_test arm at t=50
+    hsnap = hvs_prefix([PRESETS["Buddhist"]], t_fork=50.0)
+    hout = fork_hvs(hsnap, [Variant("With HVS Sync"), Variant("Sync off after t=50", enable_sync=False)])
+
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
+    for k, v in enumerate(variants):
+        ax1.plot(out["t"], out["E"][:, k].mean(axis=1), label=v.name)
+    ax1.axvline(snap.t_fork, color="gray", ls=":")
+    ax1.set_title("Tantric what-if branches from t=60 (mean E over 200 runs)")
+    ax1.legend()
+    for k, name in enumerate(("With HVS Sync", "Sync off after t=50")):
+        ax2.plot(hout["t"], hout["E"][:, k, 0], label=name)
+    ax2.axvline(hsnap.t_fork, color="gray", ls=":")
+    ax2.set_title("HVS run_ab_test arm switch at t=50 (Buddhist)")
+    ax2.legend()
+    plt.tight_layout()
+    plt.show()